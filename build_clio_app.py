@@ -4,8 +4,10 @@ APP = ["clio_app.py"]  # Your main script file
 
 # Py2app options
 OPTIONS = {
-    "packages": ["PyPDF2", "fitz"],  # Added PyMuPDF for fitz support
-    "includes": ["tkinter", "PyPDF2", "fitz"],  # tkinter for GUI, fitz for PDF text extraction
+    # fitz and the tkinter modules are imported lazily by name (clio_app._LazyModule), so py2app can't find them on its own: keep them listed
+    "packages": ["fitz"],  # Added PyMuPDF for fitz support
+    "includes": ["tkinter", "tkinter.filedialog", "tkinter.messagebox", "tkinter.scrolledtext", "tkinter.ttk",
+                 "tkinter.simpledialog", "fitz", "openpyxl"],  # tkinter for GUI, fitz for PDF text extraction, openpyxl for the log
     "iconfile": "clio.icns",  # Placeholder for your app icon file (update as needed)
     "plist": {
         "CFBundleName": "Agent Clio",
@@ -1,21 +1,61 @@
-print("CLIO: This is the current development version running.")
-# Streamlined version: Core PDF processing only, merging and DnD removed
+# Streamlined version: Core PDF processing and merging, DnD removed
 
-import tkinter as tk
-from tkinter import filedialog, messagebox, scrolledtext, ttk, simpledialog
-from PyPDF2 import PdfReader, PdfWriter 
-import fitz      # type: ignore # PyMuPDF
+import time
+_STARTED = time.perf_counter()  # for --startup-time
+import importlib
+import importlib.util
 import re
 import os
+import sys
+import shutil
+import ctypes
 import datetime
 import traceback
-from openpyxl import Workbook, load_workbook # type: ignore
+import plistlib
 import csv
+import hashlib
+import io
+import json
+import sqlite3
+import queue
+import socket
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from clio_common import PAGE_OVERLAP, atomic_write, host_tag, local_data_dir, page_range_texts
+
+
+class _LazyModule:
+    # Stands in for a heavy module until its first use, so the intake window can draw before
+    # PyMuPDF has loaded (see warm_up_imports)
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+fitz = _LazyModule("fitz")  # PyMuPDF
+# Tk is only needed once a window opens; clio_cli runs on Pythons built without it
+tk = _LazyModule("tkinter")
+filedialog = _LazyModule("tkinter.filedialog")
+messagebox = _LazyModule("tkinter.messagebox")
+scrolledtext = _LazyModule("tkinter.scrolledtext")
+ttk = _LazyModule("tkinter.ttk")
+simpledialog = _LazyModule("tkinter.simpledialog")
+# optional: vectorized page-size classification
+np = _LazyModule("numpy") if importlib.util.find_spec("numpy") else None
 
 # Summary TXT creation
-def create_summary_txt(folder, base, borrower, date_of_signing, letter_count, legal_count, other_count, total_count):
+def create_summary_txt(folder, base, borrower, date_of_signing, letter_count, legal_count, other_count, total_count,
+                       extra_counts=(), legal_blocks=()):
     filename = os.path.join(folder, f"{base}_Summary.txt")
-    with open(filename, "w", encoding="utf-8") as f:
+    with atomic_write(filename) as tmp_path, open(tmp_path, "w", encoding="utf-8") as f:
         f.write("Document Summary\n")
         f.write(f"Date Created: {datetime.date.today().strftime('%Y-%m-%d')}\n")
         f.write(f"Date of Signing: {date_of_signing}\n")
@@ -24,28 +64,269 @@ def create_summary_txt(folder, base, borrower, date_of_signing, letter_count, le
         f.write(f"  • Letter: {letter_count}\n")
         f.write(f"  • Legal: {legal_count}\n")
         f.write(f"  • Other: {other_count}\n")
+        # Extra buckets from the paper size config, as (bucket, count) pairs
+        for bucket, count in extra_counts:
+            f.write(f"  • {bucket}: {count}\n")
+        # Where each Legal block goes back in when the signed scans are merged (see read_summary_txt)
+        f.write("Legal Blocks (marker page in the Letter file → Legal pages):\n")
+        for number, (letter_page, first, last) in enumerate(legal_blocks, 1):
+            f.write(f"  • Marker {number}: Letter page {letter_page} → Legal pages {first}-{last}\n")
     print(f"  Saving summary: {filename}")
 
+# Job manifest: machine-readable record of a split, next to the outputs
+MANIFEST_VERSION = 1
+
+def create_job_manifest(folder, base, borrower, date_of_signing, source_path, source_hash, streams, legal_blocks):
+    """
+    Writes [base]_Manifest.json: every source page's bucket and page number in that bucket's output,
+    the Legal block/marker positions, and SHA-256 hashes of the source and each output, so merge and
+    audit tools don't need to re-open or re-classify the original.
+    streams are the per-bucket page streams in PAPER_TYPES order (None = marker page).
+    """
+    page_count = sum(1 for stream in streams for item in stream if item is not None)
+    pages = [None] * page_count
+    outputs = {}
+    for tp, stream in zip(PAPER_TYPES, streams):
+        if not stream:
+            continue
+        for index, page_number in enumerate(stream, 1):
+            if page_number is not None:
+                pages[page_number] = [tp, index]
+        out_path = os.path.join(folder, f"{base}_{tp}.pdf")
+        outputs[tp] = {"file": os.path.basename(out_path), "pages": len(stream), "sha256": file_content_hash(out_path)}
+    full_path = os.path.join(folder, f"{base}_Full.pdf")
+    outputs["Full"] = {"file": os.path.basename(full_path), "pages": page_count, "sha256": file_content_hash(full_path)}
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "base": base,
+        "borrower": borrower,
+        "date_of_signing": date_of_signing,
+        "paper_profile": PAPER_PROFILE,
+        "source": {"file": os.path.basename(source_path), "pages": page_count, "sha256": source_hash},
+        "outputs": outputs,
+        "legal_blocks": [{"marker": number, "letter_page": letter_page, "legal_pages": [first, last]}
+                         for number, (letter_page, first, last) in enumerate(legal_blocks, 1)],
+        "pages": pages,
+    }
+    filename = os.path.join(folder, f"{base}_Manifest.json")
+    with atomic_write(filename) as tmp_path, open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    print(f"  Saving manifest: {filename}")
+
 # ----------------- Configuration -----------------
+def _base_dir_key(base_dir):
+    # Short tag telling apart the local files kept for different BASE_DIRs
+    return hashlib.sha256(os.path.abspath(base_dir).encode("utf-8")).hexdigest()[:12]
+
+def _log_db_path(base_dir):
+    # SQLite's file locking is unreliable over SMB, so the log index is kept locally, one per BASE_DIR
+    return os.path.join(local_data_dir(), f"Clio_Log_{_base_dir_key(base_dir)}.sqlite")
+
 BASE_DIR = os.path.expanduser("~/Documents/Agents/AgentClioProject/MAB Law LLC")
 LOG_EXCEL = os.path.join(BASE_DIR, "Clio_Log.xlsx")
 LOG_CSV = os.path.join(BASE_DIR, "Clio_Log.csv")
+LOG_DB = _log_db_path(BASE_DIR)
 ERROR_LOG = os.path.join(BASE_DIR, "Clio_app_error.log")
+PAPER_SIZES_FILE = os.path.join(BASE_DIR, "Clio_Paper_Sizes.json")
+# Big packages are written in windows of this many pages to bound memory (see _write_page_stream)
+STREAM_MIN_PAGES = 400
+STREAM_PAGE_WINDOW = 200
+# Parallel batch processing: one process per core, leaving one free for the GUI
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+def set_base_dir(path):
+    # Point all output folders and logs at a different root (ClioSMB config, CLI --base-dir)
+    global BASE_DIR, LOG_EXCEL, LOG_CSV, LOG_DB, ERROR_LOG, PAPER_SIZES_FILE
+    BASE_DIR = path
+    LOG_EXCEL = os.path.join(BASE_DIR, "Clio_Log.xlsx")
+    LOG_CSV = os.path.join(BASE_DIR, "Clio_Log.csv")
+    LOG_DB = _log_db_path(BASE_DIR)
+    ERROR_LOG = os.path.join(BASE_DIR, "Clio_app_error.log")
+    PAPER_SIZES_FILE = os.path.join(BASE_DIR, "Clio_Paper_Sizes.json")
+    apply_paper_sizes(load_paper_sizes(PAPER_SIZES_FILE))
+
+# ----------------- Local staging (BASE_DIR on a network share) -----------------
+# When STAGING_DIR is set, each job's outputs are built on local disk and then copied to BASE_DIR
+# in one pass of large sequential writes, instead of many small writes over SMB.
+STAGING_DIR = None
+PUBLISH_ATTEMPTS = 3
+COPY_CHUNK = 8 * 1024 * 1024
+
+def set_staging_dir(path):
+    global STAGING_DIR
+    STAGING_DIR = path
+
+def _init_worker(base_dir, staging_dir):
+    # Pool initializer: workers may be spawned fresh (macOS), so hand them the parent's folders
+    set_base_dir(base_dir)
+    set_staging_dir(staging_dir)
+
+def _stages(path):
+    # True if path is under BASE_DIR and outputs there should be built in STAGING_DIR first
+    if not STAGING_DIR:
+        return False
+    base = os.path.abspath(BASE_DIR)
+    return os.path.commonpath([base, os.path.abspath(path)]) == base
+
+# Staged jobs still being written in this process; publish_leftover_staging must not take their files
+_staged_jobs = 0
+_staged_jobs_lock = threading.Lock()
+
+def _count_staged_job(delta):
+    global _staged_jobs
+    with _staged_jobs_lock:
+        _staged_jobs += delta
+
+def staged_path(path):
+    # Local stand-in for a path under BASE_DIR; one tree per process, so pool workers never share files
+    return os.path.join(STAGING_DIR, str(os.getpid()), os.path.relpath(path, BASE_DIR))
+
+def publish_file(src, dst):
+    """
+    Copies a staged file to dst on the share in COPY_CHUNK writes, under a temporary name that is
+    renamed into place only once the copy reads back with the same size and SHA-256. A failed or
+    mismatched copy is retried (PUBLISH_ATTEMPTS in all, with a growing pause) before OSError is raised.
+    """
+    for attempt in range(1, PUBLISH_ATTEMPTS + 1):
+        try:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            digest = hashlib.sha256()
+            with atomic_write(dst) as tmp_path:
+                with open(src, "rb") as fsrc, open(tmp_path, "wb") as fdst:
+                    for chunk in iter(lambda: fsrc.read(COPY_CHUNK), b""):
+                        digest.update(chunk)
+                        fdst.write(chunk)
+                if (os.path.getsize(tmp_path) != os.path.getsize(src)
+                        or file_content_hash(tmp_path) != digest.hexdigest()):
+                    raise OSError("the copy on the share does not match")
+            return dst
+        except OSError as e:
+            if attempt == PUBLISH_ATTEMPTS:
+                raise OSError(f"Could not copy {os.path.basename(dst)} to {os.path.dirname(dst)}: {e}")
+            print(f"  Copy to share failed ({e}); retrying ({attempt}/{PUBLISH_ATTEMPTS - 1})")
+            time.sleep(2 ** (attempt - 1))
+
+def publish_staged_files(stage_folder, folder, names):
+    # Moves the named staged files into folder (PDFs first, so summary/manifest only appear once the job is there)
+    for name in sorted(names, key=lambda n: not n.lower().endswith(".pdf")):
+        src = os.path.join(stage_folder, name)
+        publish_file(src, os.path.join(folder, name))
+        os.remove(src)
+    _remove_empty_stage_dirs(stage_folder)
+
+def _remove_empty_stage_dirs(path):
+    # Removes path and its empty parents, stopping at STAGING_DIR
+    top = os.path.abspath(STAGING_DIR)
+    path = os.path.abspath(path)
+    while path != top and os.path.commonpath([top, path]) == top:
+        try:
+            os.rmdir(path)
+        except OSError:
+            return
+        path = os.path.dirname(path)
+
+def _pid_alive(pid):
+    # True if a process with this id is running on this computer
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, but belongs to someone else
+    return True
+
+def publish_leftover_staging():
+    # Copies staged files left behind by a failed copy or a crashed process to the share; called before each batch
+    if not STAGING_DIR or not os.path.isdir(STAGING_DIR):
+        return
+    for pid in os.listdir(STAGING_DIR):
+        if pid == str(os.getpid()):
+            if _staged_jobs:
+                continue  # e.g. a merge running alongside this batch
+        elif pid.isdigit() and _pid_alive(int(pid)):
+            continue  # still running: its files are in use
+        root = os.path.join(STAGING_DIR, pid)
+        for dirpath, _, filenames in os.walk(root, topdown=False):
+            names = [n for n in filenames if not n.endswith(".tmp")]
+            if names:
+                folder = os.path.join(BASE_DIR, os.path.relpath(dirpath, root))
+                print(f"Copying earlier staged files to {folder}")
+                publish_staged_files(dirpath, folder, names)
 
 #show status window
+class StatusWindow:
+    # Live results window: file/page progress bars, status lines and a Cancel (later Close) button
+    def __init__(self, total_files=0, on_cancel=None):
+        self.on_cancel = on_cancel
+        self.closed = False
+        self.running = True
+        self.win = tk.Toplevel()
+        self.win.title("Processing Results")
+        self.win.geometry("500x400")
+        self.win.protocol("WM_DELETE_WINDOW", self.close)
+        self.label = tk.Label(self.win, text="Starting…", anchor="w")
+        self.label.pack(fill=tk.X, padx=10, pady=(8, 2))
+        self.file_bar = ttk.Progressbar(self.win, maximum=max(total_files, 1))
+        self.file_bar.pack(fill=tk.X, padx=10, pady=2)
+        self.page_bar = ttk.Progressbar(self.win, maximum=1)
+        self.page_bar.pack(fill=tk.X, padx=10, pady=2)
+        self.st = scrolledtext.ScrolledText(self.win, wrap=tk.WORD, state=tk.DISABLED)
+        self.st.pack(fill=tk.BOTH, expand=True, padx=10, pady=4)
+        self.button = tk.Button(self.win, text="Cancel", width=15, command=self.cancel)
+        self.button.pack(pady=(2, 8))
+
+    def append(self, text):
+        if self.closed:
+            return
+        self.st.config(state=tk.NORMAL)
+        self.st.insert(tk.END, text)
+        self.st.see(tk.END)
+        self.st.config(state=tk.DISABLED)
+
+    def set_file_progress(self, done, label=None):
+        if self.closed:
+            return
+        self.file_bar["value"] = done
+        if label:
+            self.label.config(text=label)
+
+    def set_page_progress(self, path, stage, done, total):
+        if self.closed:
+            return
+        self.page_bar.config(maximum=max(total, 1), value=done)
+        self.label.config(text=f"{os.path.basename(path)}: {stage} {done}/{total}")
+
+    def cancel(self):
+        if self.running and self.on_cancel:
+            self.on_cancel()
+            self.label.config(text="Cancelling… (waiting for the current file)")
+            self.button.config(state=tk.DISABLED)
+
+    def close(self):
+        if self.running:
+            self.cancel()
+        self.closed = True
+        self.win.destroy()
+
+    def finish(self, filenames=None, label="Done."):
+        self.running = False
+        if self.closed:
+            return
+        self.label.config(text=label)
+        self.file_bar["value"] = self.file_bar["maximum"]
+        # Add output filenames, if provided
+        if filenames:
+            self.append("\n\nOutput Files Created:\n")
+            for fn in filenames:
+                self.append(f"  {fn}\n")
+        self.button.config(text="Close", state=tk.NORMAL, command=self.close)
+
 def show_status_window(text, filenames=None):
-    win = tk.Toplevel()
-    win.title("Processing Results")
-    win.geometry("500x400")
-    st = scrolledtext.ScrolledText(win, wrap=tk.WORD)
-    st.pack(fill=tk.BOTH, expand=True)
-    st.insert(tk.END, text)
-    # Add output filenames, if provided
-    if filenames:
-        st.insert(tk.END, "\n\nOutput Files Created:\n")
-        for fn in filenames:
-            st.insert(tk.END, f"  {fn}\n")
-    st.config(state=tk.DISABLED)
+    status = StatusWindow()
+    status.append(text)
+    status.finish(filenames)
+    return status
 
 # --- Dialog for selecting folder and filename (for fallback/manual naming) ---
 def select_folder_and_name():
@@ -83,119 +364,866 @@ def select_folder_and_name():
     return None, None
 # —————————————————————————————————————————
 # Split + marker insertion + subfolders
-def split_and_save_pdfs(path, folder, base, reader):
+class BatchCancelled(Exception):
+    pass
+
+
+FICLONE = 0x40049409  # Linux ioctl: reflink one file's extents into another
+
+def copy_pdf_file(src, dst):
+    """
+    Copies src to dst as cheaply as the filesystem allows: a copy-on-write clone
+    (APFS clonefile, Btrfs/XFS FICLONE) when possible, else a kernel-assisted file copy.
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    if sys.platform == "darwin":
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0:
+                return
+        except (OSError, AttributeError):
+            pass
+    elif sys.platform.startswith("linux"):
+        import fcntl
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return
+        except OSError:
+            pass  # not a reflink-capable filesystem (or different volumes)
+    shutil.copyfile(src, dst)
+
+
+def _page_runs(doc, stream):
+    # Collapses a page stream into ("pages", doc, first, last) runs and ("marker", number) entries
+    runs = []
+    markers = 0
+    for item in stream:
+        if item is None:
+            markers += 1
+            runs.append(("marker", markers))
+        elif runs and runs[-1][0] == "pages" and runs[-1][3] == item - 1:
+            runs[-1] = ("pages", doc, runs[-1][2], item)
+        else:
+            runs.append(("pages", doc, item, item))
+    return runs
+
+
+def _window_runs(runs, page_window):
+    # Groups runs into windows of at most page_window pages, cutting long runs where needed
+    windows, current, size = [], [], 0
+    for run in runs:
+        if run[0] == "marker":
+            pieces = [run]
+        else:
+            pieces = [("pages", run[1], first, min(first + page_window - 1, run[3]))
+                      for first in range(run[2], run[3] + 1, page_window)]
+        for piece in pieces:
+            n = 1 if piece[0] == "marker" else piece[3] - piece[2] + 1
+            if current and size + n > page_window:
+                windows.append(current)
+                current, size = [], 0
+            current.append(piece)
+            size += n
+    if current:
+        windows.append(current)
+    return windows
+
+
+def _write_page_stream(out_path, doc, stream, report=None, page_window=0):
+    # Writes a list of source page numbers (None = numbered marker page) from doc into a new PDF
+    _write_runs(out_path, _page_runs(doc, stream), len(stream), report, page_window)
+
+
+def _write_runs(out_path, runs, total, report=None, page_window=0):
+    """
+    Writes page runs (see _page_runs; runs may come from several source documents) into a new PDF.
+    Runs from one source share a graft map (final=0 until its last run), so fonts, images and other
+    objects used by many pages are copied into the output once, and streams are copied still compressed.
+    With page_window, pages are written page_window at a time: the first window is saved, each
+    later one is appended to the file as an incremental update, and MuPDF's object cache is
+    emptied in between, so memory stays bounded by the window instead of the document.
+    (Resources shared across windows are then stored once per window.)
+    The file is built under a temporary name and renamed into place, so out_path is never half-written.
+    report(done, total) is called as pages are added.
+    """
+    windows = _window_runs(runs, page_window) if page_window else [runs]
+    print(f"  Saving: {out_path}")
+    with atomic_write(out_path) as tmp_path:
+        _write_windows(tmp_path, windows, total, report, page_window)
+
+
+def _write_windows(out_path, windows, total, report, page_window):
+    for w, window in enumerate(windows):
+        out = fitz.open(out_path) if w else fitz.open()
+        last_use = {id(run[1]): i for i, run in enumerate(window) if run[0] == "pages"}
+        for i, run in enumerate(window):
+            if run[0] == "marker":
+                add_marker_page(out, run[1])
+            else:
+                out.insert_pdf(run[1], from_page=run[2], to_page=run[3], final=int(last_use[id(run[1])] == i))
+            if report:
+                report(len(out), total)
+        if w:
+            out.saveIncr()
+        else:
+            out.save(out_path)
+        out.close()
+        if page_window:
+            fitz.TOOLS.store_shrink(100)
+
+
+def classify_page_sizes(widths, heights):
+    # Same rules as get_paper_type, for all pages at once; returns bytes of PAPER_TYPES codes
+    if np is None:
+        return bytes(_size_code(w, h) for w, h in zip(widths, heights))
+    w_in = np.asarray(widths, dtype=float) / 72
+    h_in = np.asarray(heights, dtype=float) / 72
+    short, long = np.minimum(w_in, h_in), np.maximum(w_in, h_in)
+    codes = np.full(len(w_in), OTHER, dtype=np.uint8)
+    # Apply sizes last to first so the first matching size wins
+    for size_short, size_long, tolerance, code in reversed(_SIZE_TABLE):
+        codes[(np.abs(short - size_short) < tolerance) & (np.abs(long - size_long) < tolerance)] = code
+    return codes.tobytes()
+
+
+def classify_pages(doc, report=None):
+    # Paper type code of every page, in order; report(done, total) is called per page.
+    # page.rect is the visible page: the CropBox, with /Rotate applied.
+    widths, heights = [], []
+    for page in doc:
+        if report:
+            report(page.number + 1, doc.page_count)
+        rect = page.rect
+        widths.append(rect.width)
+        heights.append(rect.height)
+    return classify_page_sizes(widths, heights)
+
+
+def _progress_reporter(path, progress, cancel):
+    def report(stage, done, total):
+        if cancel is not None and cancel.is_set():
+            raise BatchCancelled("Cancelled")
+        if progress is not None:
+            progress((path, stage, done, total))
+    return report
+
+
+def split_and_save_pdfs(path, folder, base, doc, date_of_signing=None, progress=None, cancel=None, page_types=None,
+                        normalize_full=False, page_window=None, source_hash=None):
     """
     Splits the PDF into Letter, Legal, Other, and Full, and saves to disk. Returns a summary string.
+    doc is the already-open fitz document, so the file is parsed only once per job.
+    date_of_signing goes into the summary TXT; the caller is responsible for asking for it.
+    progress((path, stage, done, total)) gets per-page updates; setting cancel (an Event) stops the job.
+    page_types (from classify_pages or the analysis cache) skips re-reading the page geometry.
+    normalize_full re-serializes _Full.pdf through MuPDF instead of copying the input file.
+    page_window writes outputs that many pages at a time (0 = all at once, None = automatic:
+    STREAM_PAGE_WINDOW for documents over STREAM_MIN_PAGES pages).
+    source_hash (the input's SHA-256, if already known) goes into the job manifest.
     """
-    # prepare writers
-    letter_writer = PdfWriter()
-    legal_writer = PdfWriter()
-    other_writer = PdfWriter()
+    if page_window is not None and page_window < 0:
+        raise ValueError(f"page_window must be 0 or more, not {page_window}")
+    report = _progress_reporter(path, progress, cancel)
+    if page_window is None:
+        page_window = STREAM_PAGE_WINDOW if doc.page_count > STREAM_MIN_PAGES else 0
+    if page_types is None:
+        page_types = classify_pages(doc, lambda done, total: report("Reading pages", done, total))
 
-    letter_count = legal_count = other_count = 0
+    # One page stream per output bucket (PAPER_TYPES order); extra buckets from the paper size
+    # config are split out like Other
+    streams = [[] for _ in PAPER_TYPES]
     in_legal_block = False
+    # Per legal block: [marker's page in the Letter output, first, last page in the Legal output], 1-based
+    legal_blocks = []
 
-    for page in reader.pages:
-        w = float(page.mediabox.width)
-        h = float(page.mediabox.height)
-        tp = get_paper_type(w, h)
-
-        if tp == "Letter":
-            letter_writer.add_page(page)
-            letter_count += 1
+    for page_number, tp in enumerate(page_types):
+        streams[tp].append(page_number)
+        if tp == LETTER:
             in_legal_block = False
-
-        elif tp == "Legal":
-            legal_writer.add_page(page)
-            legal_count += 1
+        elif tp == LEGAL:
             if not in_legal_block:
                 # one marker page in letter stream per legal block
-                letter_writer.add_blank_page(width=8.5*72, height=11*72)
+                streams[LETTER].append(None)
                 in_legal_block = True
+                legal_blocks.append([len(streams[LETTER]), len(streams[LEGAL]), 0])
+            legal_blocks[-1][2] = len(streams[LEGAL])
 
+    # Save Letter, Legal, Other and any extra buckets (if they have pages)
+    for tp, stream in zip(PAPER_TYPES, streams):
+        if stream:
+            _write_page_stream(os.path.join(folder, f"{base}_{tp}.pdf"), doc, stream,
+                               lambda done, total, tp=tp: report(f"Writing {tp}", done, total), page_window)
+    # Save Full (always!) – the input already is the full document, so copy its bytes
+    # unless normalization was asked for or MuPDF had to repair the file on open
+    report("Writing Full", 0, doc.page_count)
+    full_path = os.path.join(folder, f"{base}_Full.pdf")
+    print(f"  Saving: {full_path}")
+    with atomic_write(full_path) as tmp_path:
+        if normalize_full or doc.is_repaired or not doc.is_pdf:
+            doc.save(tmp_path)
         else:
-            other_writer.add_page(page)
-            other_count += 1
-
-    # Save Letter
-    if letter_count or in_legal_block:
-        print(f"  Saving: {os.path.join(folder, f'{base}_Letter.pdf')}")
-        with open(os.path.join(folder, f"{base}_Letter.pdf"), "wb") as f:
-            letter_writer.write(f)
-    # Save Legal
-    if legal_count:
-        print(f"  Saving: {os.path.join(folder, f'{base}_Legal.pdf')}")
-        with open(os.path.join(folder, f"{base}_Legal.pdf"), "wb") as f:
-            legal_writer.write(f)
-    # Save Other (if any)
-    if other_count:
-        print(f"  Saving: {os.path.join(folder, f'{base}_Other.pdf')}")
-        with open(os.path.join(folder, f"{base}_Other.pdf"), "wb") as f:
-            other_writer.write(f)
-    # Save Full (always!)
-    full_writer = PdfWriter()
-    for page in reader.pages:
-        full_writer.add_page(page)
-    print(f"  Saving: {os.path.join(folder, f'{base}_Full.pdf')}")
-    with open(os.path.join(folder, f"{base}_Full.pdf"), "wb") as f:
-        full_writer.write(f)
-
-    # Prompt for date of signing
-    date_of_signing = simpledialog.askstring("Date of Signing", "Enter date of signing (YYYY-MM-DD):")
+            copy_pdf_file(path, tmp_path)
+
     # Derive borrower name from base
     borrower_name = base.split("_")[0]
-    # Total count
-    total_count = len(reader.pages)
+    # Page counts per bucket and total count
+    counts = [page_types.count(code) for code in range(len(PAPER_TYPES))]
+    total_count = doc.page_count
     # Call summary TXT function
-    create_summary_txt(folder, base, borrower_name, date_of_signing, letter_count, legal_count, other_count, total_count)
+    create_summary_txt(folder, base, borrower_name, date_of_signing, *counts[:3], total_count,
+                       extra_counts=list(zip(PAPER_TYPES[3:], counts[3:])), legal_blocks=legal_blocks)
+    create_job_manifest(folder, base, borrower_name, date_of_signing, path, source_hash or file_content_hash(path),
+                        streams, legal_blocks)
 
-    return f"{os.path.basename(path)} → Letter:{letter_count}, Legal:{legal_count}, Other:{other_count}\n"
+    counts_txt = ", ".join(f"{tp}:{n}" for tp, n in zip(PAPER_TYPES, counts))
+    return f"{os.path.basename(path)} → {counts_txt}\n"
 
 
-def process_pdfs_individually_with_filelist(file_paths):
-    if not file_paths:
+def ask_signing_date(path=None):
+    title = f"Date of Signing – {os.path.basename(path)}" if path else "Date of Signing"
+    return simpledialog.askstring(title, "Enter date of signing (YYYY-MM-DD):")
+
+
+def process_single_pdf(path, date_of_signing=None, name_fallback=None, progress=None, cancel=None,
+                       normalize_full=False, page_window=None):
+    """
+    Names and splits one PDF without touching the GUI (unless name_fallback prompts).
+    Returns a result dict: file, status (ok/skipped/error/cancelled), folder, base, summary, outputs, error.
+    progress, cancel, normalize_full and page_window are passed through to split_and_save_pdfs.
+    With STAGING_DIR set, the job is built locally and then copied to its folder under BASE_DIR.
+    """
+    result = _new_result(path)
+    print(f"Processing: {path}")
+    doc = None
+    staged = False
+    try:
+        if cancel is not None and cancel.is_set():
+            raise BatchCancelled("Cancelled")  # queued before the Cancel: don't start it
+        # Open once: the same parse feeds naming, classification and all outputs
+        doc = fitz.open(path)
+        # Re-runs of an unchanged file reuse the cached name and page types
+        cache_key = file_content_hash(path)
+        cached = load_cached_analysis(cache_key, doc.page_count)
+        if cached:
+            print("  Using cached name/page analysis")
+            name, page_types = cached
+        else:
+            report = _progress_reporter(path, progress, cancel)
+            name = detect_borrower_name(doc)
+            page_types = classify_pages(doc, lambda done, total: report("Reading pages", done, total))
+            store_cached_analysis(cache_key, name, page_types)
+        folder, base = base_filename_for_name(path, name, name_fallback)
+        print(f"  Extracted folder: {folder}")
+        print(f"  Extracted base: {base}")
+        if not folder or not base:
+            result["status"] = "skipped"
+            result["summary"] = f"{os.path.basename(path)} → SKIPPED (No name/folder)\n"
+            print(f"  {result['summary'].strip()}")
+            return result
+        result["folder"], result["base"] = folder, base
+        result["borrower"] = os.path.basename(folder)
+        out_folder = folder
+        if _stages(folder):
+            out_folder, staged = staged_path(folder), True
+            _count_staged_job(+1)
+        os.makedirs(out_folder, exist_ok=True)
+        result["summary"] = split_and_save_pdfs(path, out_folder, base, doc, date_of_signing, progress, cancel,
+                                                page_types, normalize_full, page_window, cache_key)
+        # These files are always named as base + _Letter, _Legal, _Other (+ extra buckets), _Full.pdf
+        # But only created if count > 0 (except Full, always)
+        # So check which files exist and add to list
+        for typ in PAPER_TYPES + ("Full",):
+            if os.path.exists(os.path.join(out_folder, f"{base}_{typ}.pdf")):
+                result["outputs"].append(os.path.join(folder, f"{base}_{typ}.pdf"))
+        if out_folder != folder:
+            _progress_reporter(path, progress, cancel)("Copying to share", 0, 1)
+            names = [os.path.basename(p) for p in result["outputs"]] + [f"{base}_Summary.txt", f"{base}_Manifest.json"]
+            try:
+                publish_staged_files(out_folder, folder, names)
+            except OSError as e:
+                raise OSError(f"{e} (outputs kept in {out_folder}; they are copied before the next batch)")
+    except BatchCancelled:
+        print(f"  CANCELLED: {path}")
+        result = _cancelled_result(path)
+    except Exception as e:
+        print(f"  ERROR processing {path}: {e}")
+        result = _error_result(path, e)
+    finally:
+        if staged:
+            _count_staged_job(-1)
+        if doc is not None:
+            doc.close()
+    return result
+
+
+def _new_result(path):
+    return {"file": path, "status": "ok", "folder": None, "base": None, "borrower": None,
+            "summary": "", "outputs": [], "error": None}
+
+
+def _error_result(path, error):
+    result = _new_result(path)
+    result["status"] = "error"
+    result["error"] = str(error)
+    result["summary"] = f"{os.path.basename(path)} → ERROR: {str(error)}\n"
+    return result
+
+
+def _cancelled_result(path):
+    result = _new_result(path)
+    result["status"] = "cancelled"
+    result["summary"] = f"{os.path.basename(path)} → CANCELLED\n"
+    return result
+
+
+def _pump_progress(mq, progress):
+    # Forwards progress events posted by worker processes to the parent's callback
+    for event in iter(mq.get, None):
+        progress(event)
+
+
+def iter_batch_results(file_paths, dates, name_fallback=None, workers=1, progress=None, cancel=None, **options):
+    """
+    Runs process_single_pdf for each file (dates is a parallel list of signing dates),
+    spreading the files over a process pool when workers > 1. Yields results in input order;
+    per-file failures come back as error results instead of stopping the batch.
+    Once cancel (a threading.Event) is set, running files stop and the rest are not started;
+    files that had already finished are still yielded, running ones come back as cancelled.
+    Extra keyword options (e.g. normalize_full) are passed on to process_single_pdf.
+    """
+    if STAGING_DIR:
+        try:
+            publish_leftover_staging()
+        except OSError as e:
+            print(f"Staged files from an earlier batch could not be copied yet: {e}")
+    if workers <= 1 or len(file_paths) <= 1:
+        for path, date_of_signing in zip(file_paths, dates):
+            if cancel is not None and cancel.is_set():
+                return
+            yield process_single_pdf(path, date_of_signing, name_fallback, progress, cancel, **options)
         return
 
-    log_txt = ""
-    output_filenames = []
-    for path in file_paths:
-        name = os.path.basename(path)
-        print(f"Processing: {path}")
+    # Name prompts need the GUI, so workers skip unnamed files and the parent retries them in order
+    interactive = name_fallback not in (filename_name_fallback, skip_name_fallback)
+    worker_fallback = skip_name_fallback if interactive else name_fallback
+    # Progress and cancel cross the process boundary through a manager
+    manager = pump = None
+    worker_progress = worker_cancel = None
+    if progress is not None or cancel is not None:
+        manager = multiprocessing.Manager()
+        worker_cancel = manager.Event()
+        if progress is not None:
+            mq = manager.Queue()
+            worker_progress = mq.put
+            pump = threading.Thread(target=_pump_progress, args=(mq, progress), daemon=True)
+            pump.start()
+    # Workers may be spawned fresh (macOS), so hand them the current folders explicitly
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(file_paths)),
+                               initializer=_init_worker, initargs=(BASE_DIR, STAGING_DIR))
+    try:
+        futures = [pool.submit(process_single_pdf, path, date_of_signing, worker_fallback,
+                               worker_progress, worker_cancel, **options)
+                   for path, date_of_signing in zip(file_paths, dates)]
+        for path, date_of_signing, future in zip(file_paths, dates, futures):
+            # Wait in short slices so a Cancel is noticed while a long file is still running
+            while cancel is not None and not cancel.is_set() and not future.done():
+                wait([future], timeout=0.2)
+            if cancel is not None and cancel.is_set() and not worker_cancel.is_set():
+                # Stop the running files and drop the ones not started yet
+                worker_cancel.set()
+                for pending in futures:
+                    pending.cancel()
+            if future.cancelled():
+                continue
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"  ERROR processing {path}: {e}")
+                result = _error_result(path, e)
+            if interactive and result["status"] == "skipped":
+                if cancel is not None and cancel.is_set():
+                    result = _cancelled_result(path)
+                else:
+                    result = process_single_pdf(path, date_of_signing, name_fallback, progress, cancel, **options)
+            yield result
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if pump is not None:
+            mq.put(None)
+            pump.join()
+        if manager is not None:
+            manager.shutdown()
+
+
+# —————————————————————————————————————————
+# Job queue: a durable per-batch record of every file's signing date and state, so a batch interrupted
+# by a crash can be resumed where it stopped. Kept on local disk (local_data_dir()/Jobs/, one folder
+# per BASE_DIR) since it is rewritten on every state change.
+JOB_PENDING, JOB_RUNNING, JOB_DONE, JOB_FAILED = "pending", "in-progress", "done", "failed"
+
+def _jobs_dir():
+    return os.path.join(local_data_dir(), "Jobs", _base_dir_key(BASE_DIR))
+
+class JobQueue:
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+        self.lock = threading.Lock()
+
+    @classmethod
+    def create(cls, file_paths, dates):
+        job_id = f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+        data = {"id": job_id, "pid": os.getpid(),
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "files": [{"file": path, "date_of_signing": date, "state": JOB_PENDING, "summary": "",
+                           "borrower": None} for path, date in zip(file_paths, dates)]}
+        queue_ = cls(os.path.join(_jobs_dir(), f"{job_id}.json"), data)
+        os.makedirs(_jobs_dir(), exist_ok=True)
+        queue_._save()
+        return queue_
+
+    def _save(self):
+        # After a crash the file holds either the old or the new state, never half of one
+        with atomic_write(self.path) as tmp_path, open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=1)
+
+    def _entry(self, path):
+        # None once the file has finished (progress events can still arrive after that in pool mode)
+        return next((entry for entry in self.data["files"]
+                     if entry["file"] == path and entry["state"] in (JOB_PENDING, JOB_RUNNING)), None)
+
+    def claim(self):
+        # Marks the batch as run by this process, so other app instances leave it alone
+        with self.lock:
+            self.data["pid"] = os.getpid()
+            self._save()
+
+    def mark_started(self, path):
+        with self.lock:
+            entry = self._entry(path)
+            if entry and entry["state"] == JOB_PENDING:
+                entry["state"] = JOB_RUNNING
+                self._save()
+
+    def mark_finished(self, result):
+        with self.lock:
+            entry = self._entry(result["file"])
+            if entry is None:
+                return
+            entry["state"] = JOB_DONE if result["status"] == "ok" else JOB_FAILED
+            entry["summary"] = result["summary"]
+            entry["borrower"] = result["borrower"]
+            self._save()
+
+    def remaining(self):
+        # (file_paths, dates) of the files that have not finished yet, in batch order
+        entries = [e for e in self.data["files"] if e["state"] in (JOB_PENDING, JOB_RUNNING)]
+        return [e["file"] for e in entries], [e["date_of_signing"] for e in entries]
+
+    def finished(self):
+        return [e for e in self.data["files"] if e["state"] in (JOB_DONE, JOB_FAILED)]
+
+    def discard(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def unfinished_job_queues():
+    # Batches for BASE_DIR that stopped with files still pending or in progress, oldest first.
+    # Batches another running app instance is working on are left out.
+    queues = []
+    if not os.path.isdir(_jobs_dir()):
+        return queues
+    for name in sorted(os.listdir(_jobs_dir())):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(_jobs_dir(), name)
         try:
-            folder, base = extract_base_filename(path)
-            print(f"  Extracted folder: {folder}")
-            print(f"  Extracted base: {base}")
-            if not folder or not base:
-                skip_reason = f"{os.path.basename(path)} → SKIPPED (No name/folder)"
-                print(f"  {skip_reason}")
-                log_txt += skip_reason + "\n"
+            with open(path, "r", encoding="utf-8") as f:
+                queue_ = JobQueue(path, json.load(f))
+            pid = queue_.data.get("pid") or int(queue_.data["id"].rsplit("-", 1)[1])
+            if pid != os.getpid() and _pid_alive(pid):
                 continue
-            os.makedirs(folder, exist_ok=True)
-            reader = PdfReader(path)
-            # Call split_and_save_pdfs and collect output filenames
-            summary = split_and_save_pdfs(path, folder, base, reader)
-            log_txt += summary
-            # Add all output files that are created
-            date_str = datetime.date.today().strftime("%m%d%Y")
-            # These files are always named as base + _Letter, _Legal, _Other, _Full.pdf
-            # But only created if count > 0 (except Full, always)
-            # So check which files exist and add to list
-            for typ in ["Letter", "Legal", "Other", "Full"]:
-                out_path = os.path.join(folder, f"{base}_{typ}.pdf")
-                if os.path.exists(out_path):
-                    output_filenames.append(out_path)
-        except Exception as e:
-            print(f"  ERROR processing {path}: {e}")
-            log_txt += f"{os.path.basename(path)} → ERROR: {str(e)}\n"
+            if queue_.remaining()[0]:
+                queues.append(queue_)
+        except (OSError, ValueError, KeyError, IndexError):
             continue
+    return queues
+
+def offer_resume(on_done=None):
+    # Called when the intake window opens: offers to finish batches a crash left behind
+    for job_queue in unfinished_job_queues():
+        remaining = len(job_queue.remaining()[0])
+        total = len(job_queue.data["files"])
+        if messagebox.askyesno("Resume Batch",
+                               f"A batch started {job_queue.data['created'].replace('T', ' ')} stopped with "
+                               f"{remaining} of {total} files unfinished.\n\nResume it now?"):
+            process_pdfs_individually_with_filelist(None, on_done, job_queue=job_queue)
+            return True
+        job_queue.discard()
+    return False
+
+def process_pdfs_individually_with_filelist(file_paths, on_done=None, job_queue=None):
+    """
+    Processes the batch on a background thread so the GUI stays responsive.
+    Progress is shown live in a StatusWindow; on_done() runs on the Tk thread when the batch ends.
+    Every file's state is kept in a JobQueue; pass job_queue (from unfinished_job_queues) to resume
+    an interrupted batch instead of starting a new one.
+    """
+    if job_queue is not None:
+        job_queue.claim()
+        file_paths, dates = job_queue.remaining()
+    elif not file_paths:
+        return
+    else:
+        file_paths = list(file_paths)
+        # Ask every date up front so the files can then be processed in parallel
+        dates = [ask_signing_date(path) for path in file_paths]
+        job_queue = JobQueue.create(file_paths, dates)
+
+    events = queue.Queue()
+    cancel = threading.Event()
+    status = StatusWindow(len(file_paths), on_cancel=cancel.set)
+    root = tk._default_root
+
+    def ask_on_main_thread(func, *args):
+        # Tk dialogs must run on the Tk thread; block the worker until the answer comes back
+        reply = {"ready": threading.Event(), "value": None}
+        events.put(("ask", func, args, reply))
+        reply["ready"].wait()
+        return reply["value"]
+
+    def gui_name_fallback(pdf_path):
+        return ask_on_main_thread(manual_name_prompt, pdf_path)
+
+    def on_progress(event):
+        job_queue.mark_started(event[0])
+        events.put(("page",) + tuple(event))
+
+    def run_batch():
+        done_files = []
+        try:
+            results = iter_batch_results(file_paths, dates, gui_name_fallback, workers=DEFAULT_WORKERS,
+                                         progress=on_progress, cancel=cancel)
+            for i, result in enumerate(results):
+                if result["status"] != "cancelled":
+                    job_queue.mark_finished(result)
+                done_files.append(result["file"])
+                events.put(("file", i + 1, result))
+            # Log the whole batch, including files finished before an interruption
+            finished = job_queue.finished()
+            log_txt = "".join(entry["summary"] for entry in finished)
+            if cancel.is_set():
+                log_txt += f"CANCELLED after {len(finished)} of {len(job_queue.data['files'])} files\n"
+            if finished:
+                log_action("Process", [os.path.basename(e["file"]) for e in finished], log_txt,
+                           [e["borrower"] for e in finished if e["borrower"]])
+            # Finished or cancelled on purpose: nothing to resume
+            job_queue.discard()
+        except Exception:
+            with open(ERROR_LOG, "a") as f:
+                f.write(traceback.format_exc() + "\n")
+            events.put(("crash", traceback.format_exc()))
+        events.put(("done", len(done_files)))
+
+    output_filenames = []
+
+    def poll():
+        try:
+            while True:
+                event = events.get_nowait()
+                kind = event[0]
+                if kind == "page":
+                    status.set_page_progress(*event[1:])
+                elif kind == "file":
+                    _, done, result = event
+                    status.append(result["summary"])
+                    output_filenames.extend(result["outputs"])
+                    status.set_file_progress(done, f"Finished {done} of {len(file_paths)} files")
+                elif kind == "ask":
+                    _, func, args, reply = event
+                    try:
+                        reply["value"] = func(*args)
+                    finally:
+                        reply["ready"].set()
+                elif kind == "crash":
+                    status.append(f"\nUNEXPECTED ERROR (logged to {ERROR_LOG}):\n{event[1]}")
+                elif kind == "done":
+                    label = "Cancelled." if cancel.is_set() else "Done."
+                    status.finish(output_filenames, label)
+                    print("Batch processing complete. See above for details.")
+                    if on_done:
+                        on_done()
+                    return
+        except queue.Empty:
+            pass
+        root.after(100, poll)
 
-    # Show status window with all results and output files
-    show_status_window(log_txt, filenames=output_filenames)
-    log_action("Process", [os.path.basename(f) for f in file_paths], log_txt)
-    print("Batch processing complete. See above for details.")
+    threading.Thread(target=run_batch, daemon=True).start()
+    root.after(100, poll)
+
+# —————————————————————————————————————————
+# Merge: signed Letter + Legal scans back into document order.
+# The signed Letter stack still holds the numbered marker pages; each marker is replaced by its
+# Legal block, at the positions recorded in the job's _Summary.txt.
+_SUMMARY_MARKER_RE = re.compile(r"^\s*• Marker (\d+): Letter page (\d+) → Legal pages (\d+)-(\d+)$")
+_SUMMARY_COUNT_RE = re.compile(r"^\s*• ([A-Za-z0-9][A-Za-z0-9 -]*): (\d+)$")
+_MARKER_TEXT_RE = re.compile(r"Marker\s*Page\s*(\d+)", re.IGNORECASE)
+
+def read_summary_txt(path):
+    """
+    Reads a _Summary.txt back: date_of_signing, borrower, total, counts ({bucket: pages}) and
+    legal_blocks ([(letter_page, legal_first, legal_last)], 1-based; None in summaries written
+    before block positions were recorded).
+    """
+    summary = {"date_of_signing": None, "borrower": None, "total": None, "counts": {}, "legal_blocks": None}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            marker = _SUMMARY_MARKER_RE.match(line)
+            count = _SUMMARY_COUNT_RE.match(line)
+            if marker and summary["legal_blocks"] is not None:
+                summary["legal_blocks"].append(tuple(int(g) for g in marker.groups()[1:]))
+            elif count:
+                summary["counts"][count.group(1)] = int(count.group(2))
+            elif line.startswith("Legal Blocks"):
+                summary["legal_blocks"] = []
+            elif line.startswith("Date of Signing:"):
+                summary["date_of_signing"] = line.split(":", 1)[1].strip()
+            elif line.startswith("Borrower(s):"):
+                summary["borrower"] = line.split(":", 1)[1].strip()
+            elif line.startswith("Total Page Count:"):
+                summary["total"] = int(line.split(":", 1)[1])
+    return summary
+
+def read_job_layout(path):
+    """
+    Same dict as read_summary_txt, for the job that path (its _Summary.txt or _Manifest.json) belongs to.
+    Uses the job's manifest when there is one, else parses the summary.
+    """
+    manifest_path = re.sub(r"_Summary\.txt$", "_Manifest.json", path)
+    if not (manifest_path.endswith("_Manifest.json") and os.path.exists(manifest_path)):
+        return read_summary_txt(path)
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    counts = {}
+    for tp, _ in manifest["pages"]:
+        counts[tp] = counts.get(tp, 0) + 1
+    return {"date_of_signing": manifest["date_of_signing"], "borrower": manifest["borrower"],
+            "total": manifest["source"]["pages"], "counts": counts,
+            "legal_blocks": [(block["letter_page"], *block["legal_pages"]) for block in manifest["legal_blocks"]]}
+
+def merged_filename(base, date_of_signing=None):
+    # "[base] Complete and Signed [YYYY-MM-DD] (Merged).pdf"; today if the signing date isn't a date
+    try:
+        date = datetime.date.fromisoformat(str(date_of_signing).strip()).isoformat()
+    except ValueError:
+        date = datetime.date.today().isoformat()
+    return f"{base} Complete and Signed {date} (Merged).pdf"
+
+def check_scan_count(paths):
+    if len(paths) not in (1, 2):
+        raise ValueError("Select the signed Letter scan and the signed Legal scan (2 files).")
+
+def identify_scans(paths):
+    # Returns (letter_scan, legal_scan): the scan with the larger share of Legal-size pages (or, on a
+    # tie, "legal" in its name) is the Legal one. A single file is the Letter scan.
+    # Reads every page's size, so call it off the Tk thread.
+    check_scan_count(paths)
+    if len(paths) == 1:
+        return paths[0], None
+    def legal_share(path):
+        with fitz.open(path) as doc:
+            page_types = classify_pages(doc)
+        return page_types.count(LEGAL) / max(len(page_types), 1), "legal" in os.path.basename(path).lower()
+    letter_scan, legal_scan = sorted(paths, key=legal_share)
+    return letter_scan, legal_scan
+
+def _check_marker_page(doc, index, number):
+    # Image-only scans can't be checked; with a text layer the page must not be a different marker
+    # or an ordinary page of text (a sign the stacks were scanned out of order)
+    text = doc[index].get_text()
+    found = _MARKER_TEXT_RE.search(text)
+    if (found and int(found.group(1)) != number) or (not found and len(text.strip()) > 200):
+        raise ValueError(f"Letter scan page {index + 1} should be Marker Page {number}.")
+
+def merge_signed_scans(job_path, letter_scan, legal_scan=None, progress=None, cancel=None, page_window=None):
+    """
+    Interleaves the signed Letter scan (with its marker pages) and the signed Legal scan back into
+    document order, saved in the job folder as "[base] Complete and Signed [date] (Merged).pdf".
+    job_path is the job's _Summary.txt or _Manifest.json (see read_job_layout).
+    Page counts are checked against the job layout first; any mismatch raises ValueError.
+    Pages are copied run by run from the open scans (see _write_runs), so neither scan is loaded whole.
+    Returns the output path.
+    """
+    summary = read_job_layout(job_path)
+    letter_count = summary["counts"].get("Letter", 0)
+    legal_count = summary["counts"].get("Legal", 0)
+    blocks = summary["legal_blocks"]
+    name = os.path.basename(job_path)
+    if blocks is None:
+        if legal_count:
+            raise ValueError(f"{name} has no Legal block positions; re-run Process on the original document.")
+        blocks = []
+    if sum(last - first + 1 for _, first, last in blocks) != legal_count:
+        raise ValueError(f"{name} is inconsistent: its Legal blocks don't add up to {legal_count} Legal pages.")
+    if legal_count and not legal_scan:
+        raise ValueError(f"This job has {legal_count} Legal pages; select the signed Legal scan too.")
+
+    report = _progress_reporter(letter_scan, progress, cancel)
+    folder = os.path.dirname(job_path)
+    base = re.sub(r"_(Summary\.txt|Manifest\.json)$", "", name)
+    if base == name:
+        base = os.path.splitext(name)[0]
+    out_path = os.path.join(folder, merged_filename(base, summary["date_of_signing"]))
+    letter = fitz.open(letter_scan)
+    legal = fitz.open(legal_scan) if legal_scan else None
+    try:
+        expected = letter_count + len(blocks)
+        if letter.page_count != expected:
+            raise ValueError(f"The Letter scan has {letter.page_count} pages; {name} expects {expected} "
+                             f"({letter_count} Letter + {len(blocks)} marker pages).")
+        if legal is not None and legal.page_count != legal_count:
+            raise ValueError(f"The Legal scan has {legal.page_count} pages; {name} expects {legal_count}.")
+
+        # Marker page index in the Letter scan → (first, last) page index in the Legal scan
+        markers = {}
+        for number, (letter_page, first, last) in enumerate(blocks, 1):
+            _check_marker_page(letter, letter_page - 1, number)
+            markers[letter_page - 1] = (first - 1, last - 1)
+        runs = []
+        for page_number in range(letter.page_count):
+            if page_number in markers:
+                runs.append(("pages", legal) + markers[page_number])
+            elif runs and runs[-1][1] is letter and runs[-1][3] == page_number - 1:
+                runs[-1] = ("pages", letter, runs[-1][2], page_number)
+            else:
+                runs.append(("pages", letter, page_number, page_number))
+
+        total = letter_count + legal_count
+        if page_window is None:
+            page_window = STREAM_PAGE_WINDOW if total > STREAM_MIN_PAGES else 0
+        if _stages(out_path):
+            staged_out = staged_path(out_path)
+            _count_staged_job(+1)
+            try:
+                os.makedirs(os.path.dirname(staged_out), exist_ok=True)
+                _write_runs(staged_out, runs, total, lambda done, total: report("Merging", done, total), page_window)
+                publish_staged_files(os.path.dirname(staged_out), folder, [os.path.basename(out_path)])
+            finally:
+                _count_staged_job(-1)
+        else:
+            _write_runs(out_path, runs, total, lambda done, total: report("Merging", done, total), page_window)
+    finally:
+        letter.close()
+        if legal is not None:
+            legal.close()
+    return out_path
+
+def merge_scans_with_filelist(file_paths, on_done=None):
+    """
+    Merges the selected signed scans (Letter, plus Legal if the job has Legal pages) on a background
+    thread, after asking for the job's _Summary.txt (or _Manifest.json). on_done() runs on the Tk
+    thread when it ends. Which scan is Letter and which is Legal is worked out on that thread too.
+    """
+    def finish_now():
+        if on_done:
+            on_done()
+
+    file_paths = list(file_paths)
+    try:
+        check_scan_count(file_paths)
+    except ValueError as e:
+        messagebox.showerror("Merge", str(e))
+        return finish_now()
+    job_path = filedialog.askopenfilename(
+        title="Select the job's _Summary.txt", initialdir=BASE_DIR,
+        filetypes=[("Clio job", "*_Summary.txt *_Manifest.json"), ("All files", "*")])
+    if not job_path:
+        return finish_now()
+
+    events = queue.Queue()
+    cancel = threading.Event()
+    status = StatusWindow(1, on_cancel=cancel.set)
+    status.win.title("Merge Results")
+    root = tk._default_root
+
+    def run_merge():
+        try:
+            letter_scan, legal_scan = identify_scans(file_paths)
+            names = [os.path.basename(p) for p in (letter_scan, legal_scan) if p]
+            out_path = merge_signed_scans(job_path, letter_scan, legal_scan,
+                                          progress=lambda event: events.put(("page",) + tuple(event)),
+                                          cancel=cancel)
+            summary = f"{' + '.join(names)} → {os.path.basename(out_path)}\n"
+            log_action("Merge", names, summary, [os.path.basename(os.path.dirname(job_path))])
+            events.put(("done", summary, [out_path], "Done."))
+        except BatchCancelled:
+            events.put(("done", "Merge cancelled.\n", [], "Cancelled."))
+        except ValueError as e:
+            events.put(("done", f"NOT MERGED: {e}\n", [], "Not merged."))
+        except Exception:
+            with open(ERROR_LOG, "a") as f:
+                f.write(traceback.format_exc() + "\n")
+            events.put(("done", f"\nUNEXPECTED ERROR (logged to {ERROR_LOG}):\n{traceback.format_exc()}", [],
+                        "Failed."))
+
+    def poll():
+        try:
+            while True:
+                event = events.get_nowait()
+                if event[0] == "page":
+                    status.set_page_progress(*event[1:])
+                elif event[0] == "done":
+                    _, text, outputs, label = event
+                    status.append(text)
+                    status.finish(outputs, label)
+                    return finish_now()
+        except queue.Empty:
+            pass
+        root.after(100, poll)
+
+    status.append(f"Merging {' + '.join(os.path.basename(p) for p in file_paths)}\n"
+                  f"using {os.path.basename(job_path)}\n")
+    threading.Thread(target=run_merge, daemon=True).start()
+    root.after(100, poll)
 
 #intake Screen 
-def show_intake_window():
+def warm_up_imports():
+    # Loads the heavy libraries in the background once the window is up, so the first click doesn't wait
+    fitz.open
+    import openpyxl  # type: ignore  # noqa: F401
+
+def app_version():
+    # CFBundleShortVersionString inside the py2app bundle, "dev" when run from source
+    resources = os.environ.get("RESOURCEPATH")
+    if getattr(sys, "frozen", False) and resources:
+        try:
+            with open(os.path.join(resources, "..", "Info.plist"), "rb") as f:
+                return plistlib.load(f).get("CFBundleShortVersionString", "?")
+        except (OSError, plistlib.InvalidFileException):
+            pass
+    return "dev"
+
+def record_startup_time(window_secs, ready_secs):
+    # Appends one launch to BASE_DIR/Clio_Startup_Times.csv so cold-launch time can be compared across releases
+    path = os.path.join(BASE_DIR, "Clio_Startup_Times.csv")
+    row = [datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), socket.gethostname(), app_version(),
+           f"{window_secs * 1000:.0f}", f"{ready_secs * 1000:.0f}"]
+    new_file = not os.path.exists(path)
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["Date", "Host", "Version", "Window shown (ms)", "Libraries loaded (ms)"])
+        writer.writerow(row)
+    print(f"Startup: window shown after {row[3]} ms, libraries loaded after {row[4]} ms (saved to {path})")
+
+def show_intake_window(measure_startup=False):
+    """
+    Main window. With measure_startup, records how long it took to appear and for the heavy
+    libraries to load (record_startup_time), then closes itself.
+    """
     intake_win = tk.Tk()
     intake_win.title("Clio Document Intake")
     intake_win.geometry("900x350")
@@ -217,13 +1245,29 @@ def show_intake_window():
         if not selected_files:
             messagebox.showerror("No Files", "Please select PDFs first.")
             return
-        process_pdfs_individually_with_filelist(selected_files)
+        # Runs in the background; Process stays disabled until the batch finishes
+        process_btn.config(state=tk.DISABLED)
+        process_pdfs_individually_with_filelist(
+            list(selected_files), on_done=lambda: process_btn.config(state=tk.NORMAL))
+
+    def merge_files():
+        if not selected_files:
+            messagebox.showerror("No Files", "Please select the signed scans first.")
+            return
+        merge_btn.config(state=tk.DISABLED)
+        merge_scans_with_filelist(list(selected_files), on_done=lambda: merge_btn.config(state=tk.NORMAL))
 
     def refresh():
         selected_files.clear()
         file_listbox.delete(0, tk.END)
 
     def exit_app():
+        # Bring Clio_Log.xlsx up to date once per session rather than after every batch
+        try:
+            export_log_excel()
+        except Exception:
+            with open(ERROR_LOG, "a") as f:
+                f.write(traceback.format_exc() + "\n")
         intake_win.destroy()
 
     file_listbox = tk.Listbox(intake_win, width=100, height=10)
@@ -234,13 +1278,41 @@ def show_intake_window():
     btn_frame = tk.Frame(intake_win)
     btn_frame.pack(pady=20)
 
-    tk.Button(btn_frame, text="Process", width=15, command=process_files).grid(row=0, column=0, padx=5)
-    tk.Button(btn_frame, text="Refresh", width=15, command=refresh).grid(row=0, column=1, padx=5)
-    tk.Button(btn_frame, text="Exit", width=15, command=exit_app).grid(row=0, column=2, padx=5)
+    process_btn = tk.Button(btn_frame, text="Process", width=15, command=process_files)
+    process_btn.grid(row=0, column=0, padx=5)
+    merge_btn = tk.Button(btn_frame, text="Merge", width=15, command=merge_files)
+    merge_btn.grid(row=0, column=1, padx=5)
+    tk.Button(btn_frame, text="Refresh", width=15, command=refresh).grid(row=0, column=2, padx=5)
+    tk.Button(btn_frame, text="View Log", width=15, command=view_log).grid(row=0, column=3, padx=5)
+    tk.Button(btn_frame, text="Exit", width=15, command=exit_app).grid(row=0, column=4, padx=5)
 
+    intake_win.protocol("WM_DELETE_WINDOW", exit_app)
+    # Offer to finish a batch that a crash interrupted
+    def resume_unfinished():
+        process_btn.config(state=tk.DISABLED)
+        if not offer_resume(on_done=lambda: process_btn.config(state=tk.NORMAL)):
+            process_btn.config(state=tk.NORMAL)
+
+    def window_shown():
+        shown = time.perf_counter() - _STARTED
+        warm_up = threading.Thread(target=warm_up_imports, daemon=True)
+        warm_up.start()
+        if not measure_startup:
+            intake_win.after(200, resume_unfinished)
+            return
+        def wait_for_libraries():
+            if warm_up.is_alive():
+                intake_win.after(10, wait_for_libraries)
+                return
+            record_startup_time(shown, time.perf_counter() - _STARTED)
+            intake_win.destroy()
+        wait_for_libraries()
+
+    # Runs once the window has been drawn and the event loop is idle
+    intake_win.after(0, lambda: intake_win.after_idle(window_shown))
     intake_win.mainloop()
 # --- Manual entry popup for name if not found automatically ---
-def manual_name_prompt():
+def manual_name_prompt(pdf_path=None):
     class NamePrompt(simpledialog.Dialog):
         def body(self, master):
             tk.Label(master, text="Last Name (max 10 letters):").grid(row=0)
@@ -271,7 +1343,10 @@ def manual_name_prompt():
             self.result = (self.last_var.get().strip().capitalize(), self.init_var.get().strip().upper())
 
     parent = tk._default_root if tk._default_root else tk.Toplevel()
-    prompt = NamePrompt(parent, "Filename: Cannot find name. Please provide last name (max 10 letters) and first initial.")
+    title = "Filename: Cannot find name. Please provide last name (max 10 letters) and first initial."
+    if pdf_path:
+        title += f" ({os.path.basename(pdf_path)})"
+    prompt = NamePrompt(parent, title)
     if not tk._default_root:
         parent.destroy()
     if hasattr(prompt, "result") and prompt.result and prompt.result[0] and prompt.result[1]:
@@ -279,137 +1354,291 @@ def manual_name_prompt():
     else:
         return None
 
+# --- Non-interactive name fallbacks for headless runs (return "Last_I" or None) ---
+def filename_name_fallback(pdf_path):
+    # Use the input file's own name, e.g. "Smith closing pkg.pdf" → "Smith_closing_pkg"
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    cleaned = re.sub(r"[^A-Za-z0-9_-]+", "_", stem).strip("_")[:20]
+    return cleaned or None
+
+def skip_name_fallback(pdf_path):
+    return None
+
+NAME_FALLBACKS = {
+    "prompt": manual_name_prompt,
+    "filename": filename_name_fallback,
+    "skip": skip_name_fallback,
+}
+
 # —————————————————————————————————————————
-# Helper: extract base filename from PDF content
-def extract_base_filename(pdf_path):
-    doc = fitz.open(pdf_path)
-    text = ""
-
-    # --- Pages to skip if they contain agent/instruction keywords ---
-    instruction_filters = [
-        "attention closing agent",
-        "closing agent instruction",
-        "instructions to the closing agent",
-        "attention signing agent",
-        "notary checklist",
-        "special instructions",
-        "agent acknowledgement",
-    ]
-
-    # --- Expanded list of words/roles that should never be used as borrower names ---
-    not_borrower_filters = [
-        "lender", "lenders", "lender name", "lender rep", "lender representative",
-        "mortgage company", "mortgage companies", "bank", "banks", "servicer", "servicers",
-        "broker", "brokers", "realty", "real estate", "real estate agent", "real estate agents",
-        "title", "title agent", "title agents", "title rep", "title reps", "title company", "title companies",
-        "escrow officer", "escrow officers", "settlement agent", "settlement agents", "notary", "notaries",
-        "witness", "witnesses", "signature", "signatures", "loan officer", "loan officers", "processor", "processors",
-        "signing agent", "signing agents", "closing agent", "closing agents", "underwriter", "underwriters",
-        "attorney", "attorneys", "law firm", "law firms", "company", "companies", "inc", "inc.", "llc", "llc.", "corp",
-        "corporation", "corporations", "co.", "co", "llp", "llp.", "pllc", "pllc.", "plc", "plc.", "pa", "p.a.", "pc", "p.c.",
-        "associates", "associate", "group", "groups", "firm", "firms", "office", "offices", "department", "departments",
-        "division", "divisions", "section", "sections", "admin", "administrator", "administrators", "administer",
-        "president", "presidents", "vice president", "secretary", "secretaries", "manager", "managers", "management",
-        "director", "directors", "officer", "officers", "official", "officials", "contact", "contacts", "employee", "employees",
-        "staff", "team", "teams", "counsel", "adviser", "advisor", "consultant", "consultants", "independent contractor",
-        "independent contractors", "contractor", "contractors", "organizer", "organizers", "participant", "participants",
-        "benefactor", "benefactors", "grantor", "grantors", "grantee", "grantees", "remitter", "remitters",
-        "payee", "payees", "payor", "payors", "mortgagor", "mortgagors", "mortgagee", "mortgagees",
-        "trust", "trusts", "trustee", "trustees", "foundation", "foundations", "estate", "estates", "heir", "heirs",
-        "beneficiary", "beneficiaries", "power of attorney", "poa", "personal representative", "personal representatives",
-        "successor", "successors", "authorized", "representative", "representatives", "agent", "agents", "approved",
-        "accept", "accepted", "seller", "sellers", "buyer", "buyers", "borrower", "borrowers", "co-borrower", "co-borrowers",
-        "joint tenant", "joint tenants", "spouse", "spouses", "partner", "partners", "appointee", "appointees",
-        "recipient", "recipients", "customer", "customers", "client", "clients", "occupant", "occupants",
-        "landlord", "landlords", "tenant", "tenants", "lessee", "lessees", "lessor", "lessors", "guarantor", "guarantors",
-        "north charleston", "charleston", "clearedge", "deceased", "account", "accounts", "section", "sections",
-        "division", "divisions", "administer", "controller", "supervisor", "supervisors", "applicant", "applicants"
-    ]
-    generic_labels = {"borrower", "owner", "seller", "buyer", "applicant", "customer", "client"}
-
-    # --- Concatenate non-instruction pages ---
-    for i in range(min(20, doc.page_count)):
-        page_text = doc[i].get_text()
-        page_start = page_text[:300].lower()
-        # Smarter skip: If a page is instructions, but has borrower info, keep it
-        if any(filter_text in page_start for filter_text in instruction_filters):
-            if ("homeowner name" in page_text.lower()) or ("borrower" in page_text.lower()) or ("applicant" in page_text.lower()):
-                text += page_text
-                continue
+# Name matching tables, compiled once at import
+# --- Pages to skip if they contain agent/instruction keywords ---
+INSTRUCTION_FILTERS = [
+    "attention closing agent",
+    "closing agent instruction",
+    "instructions to the closing agent",
+    "attention signing agent",
+    "notary checklist",
+    "special instructions",
+    "agent acknowledgement",
+]
+
+# --- Expanded list of words/roles that should never be used as borrower names ---
+NOT_BORROWER_FILTERS = [
+    "lender", "lenders", "lender name", "lender rep", "lender representative",
+    "mortgage company", "mortgage companies", "bank", "banks", "servicer", "servicers",
+    "broker", "brokers", "realty", "real estate", "real estate agent", "real estate agents",
+    "title", "title agent", "title agents", "title rep", "title reps", "title company", "title companies",
+    "escrow officer", "escrow officers", "settlement agent", "settlement agents", "notary", "notaries",
+    "witness", "witnesses", "signature", "signatures", "loan officer", "loan officers", "processor", "processors",
+    "signing agent", "signing agents", "closing agent", "closing agents", "underwriter", "underwriters",
+    "attorney", "attorneys", "law firm", "law firms", "company", "companies", "inc", "inc.", "llc", "llc.", "corp",
+    "corporation", "corporations", "co.", "co", "llp", "llp.", "pllc", "pllc.", "plc", "plc.", "pa", "p.a.", "pc", "p.c.",
+    "associates", "associate", "group", "groups", "firm", "firms", "office", "offices", "department", "departments",
+    "division", "divisions", "section", "sections", "admin", "administrator", "administrators", "administer",
+    "president", "presidents", "vice president", "secretary", "secretaries", "manager", "managers", "management",
+    "director", "directors", "officer", "officers", "official", "officials", "contact", "contacts", "employee", "employees",
+    "staff", "team", "teams", "counsel", "adviser", "advisor", "consultant", "consultants", "independent contractor",
+    "independent contractors", "contractor", "contractors", "organizer", "organizers", "participant", "participants",
+    "benefactor", "benefactors", "grantor", "grantors", "grantee", "grantees", "remitter", "remitters",
+    "payee", "payees", "payor", "payors", "mortgagor", "mortgagors", "mortgagee", "mortgagees",
+    "trust", "trusts", "trustee", "trustees", "foundation", "foundations", "estate", "estates", "heir", "heirs",
+    "beneficiary", "beneficiaries", "power of attorney", "poa", "personal representative", "personal representatives",
+    "successor", "successors", "authorized", "representative", "representatives", "agent", "agents", "approved",
+    "accept", "accepted", "seller", "sellers", "buyer", "buyers", "borrower", "borrowers", "co-borrower", "co-borrowers",
+    "joint tenant", "joint tenants", "spouse", "spouses", "partner", "partners", "appointee", "appointees",
+    "recipient", "recipients", "customer", "customers", "client", "clients", "occupant", "occupants",
+    "landlord", "landlords", "tenant", "tenants", "lessee", "lessees", "lessor", "lessors", "guarantor", "guarantors",
+    "north charleston", "charleston", "clearedge", "deceased", "account", "accounts", "section", "sections",
+    "division", "divisions", "administer", "controller", "supervisor", "supervisors", "applicant", "applicants"
+]
+GENERIC_LABELS = {"borrower", "owner", "seller", "buyer", "applicant", "customer", "client"}
+NOT_BORROWER_SET = frozenset(NOT_BORROWER_FILTERS)
+
+def _trie_regex(words):
+    """
+    Builds one regex that matches any of words, shaped as a prefix trie ("lend(?:er)?...")
+    so the regex engine walks each candidate once instead of retrying every word.
+    Words that contain a shorter word are dropped: the shorter one already matches.
+    """
+    words = sorted(set(words), key=len)
+    kept = []
+    for w in words:
+        if not any(k in w for k in kept):
+            kept.append(w)
+    trie = {}
+    for w in kept:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        if "" in node:
+            return ""  # a kept word ends here, and no kept word extends it
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items())]
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return re.compile(build(trie))
+
+# Any filter word anywhere in the (lowercased) candidate disqualifies it
+NOT_BORROWER_RE = _trie_regex(NOT_BORROWER_FILTERS)
+_INVALID_NAME_CHARS_RE = re.compile(r"[^a-zA-Z ,.'&-]")
+
+# --- Helper function: clean and validate candidate name ---
+def is_valid_name(candidate):
+    candidate_lower = candidate.lower().strip()
+    # Reject if it's a generic label exactly
+    if candidate_lower in GENERIC_LABELS:
+        return False
+    # Reject if matches any filter term (substring)
+    if NOT_BORROWER_RE.search(candidate_lower):
+        return False
+    # Reject if contains digits or odd characters
+    if _INVALID_NAME_CHARS_RE.search(candidate):
+        return False
+    # Reject if too short
+    if len(candidate) < 3:
+        return False
+    return True
+
+
+# --- Known name labels, highest priority first; each is followed by the name itself ---
+LABEL_PATTERNS = [
+    r"Borrower Information\s*[:\n]+",
+    r"Borrower\(s\):\s*",
+    r"Borrower:\s*",
+    r"Homeowner Name\(s\):\s*",
+    r"Owner\(s\):\s*",
+    r"Property Owner\(s\):\s*",
+    r"Seller\(s\):\s*",
+    r"Buyer\(s\):\s*",
+    r"Applicant\(s\):\s*",
+    r"Client:\s*",
+    r"Customer:\s*",
+]
+_NAME_CHARS = r"[A-Za-z ,.'&-]+"
+_LABEL_RES = [re.compile(f"{label}({_NAME_CHARS})", re.IGNORECASE) for label in LABEL_PATTERNS]
+# All labels in one zero-width scanner, so overlapping labels ("Property Owner(s):" / "Owner(s):")
+# are still seen. The leading character class lets the regex engine skip most positions outright.
+_LABEL_FIRST_CHARS = "".join(sorted({label[0].lower() + label[0].upper() for label in LABEL_PATTERNS}))
+_LABEL_SCANNER = re.compile(
+    f"(?=[{_LABEL_FIRST_CHARS}])(?="
+    + "|".join(f"{label}(?P<n{i}>{_NAME_CHARS})" for i, label in enumerate(LABEL_PATTERNS))
+    + ")",
+    re.IGNORECASE)
+_CAP_NAME_RE = re.compile(r"\b([A-Z][a-z]+(?: [A-Z][a-z]+)+)\b")
+_ALL_CAPS_NAME_RE = re.compile(r"\n([A-Z]{2,} [A-Z]{2,})\n")
+
+def scan_label_hits(text):
+    """
+    Walks text once with every label at the same time. Returns {priority: (position, captured name)}
+    holding each label's first hit, i.e. what re.search(label, text) would have found.
+    """
+    hits = {}
+    for m in _LABEL_SCANNER.finditer(text):
+        first = int(m.lastgroup[1:])
+        hits.setdefault(first, (m.start(), m.group(m.lastgroup)))
+        # Another (later) label could start at this same spot; check the few still missing
+        for i, label_re in enumerate(_LABEL_RES):
+            if i > first and i not in hits:
+                other = label_re.match(text, m.start())
+                if other:
+                    hits[i] = (m.start(), other.group(1))
+        if len(hits) == len(LABEL_PATTERNS):
+            break
+    return hits
+
+def _label_candidate(raw):
+    # First person named after a label, or None if it is a generic/filtered/invalid name
+    candidate = raw.split(' and ')[0].split(',')[0].strip()
+    candidate_lower = candidate.lower().strip()
+    if candidate_lower in GENERIC_LABELS or candidate_lower in NOT_BORROWER_SET:
+        return None  # skip generic/filtered names
+    return candidate if is_valid_name(candidate) else None
+
+# Naming reads at most this many pages, and stops early once one of the first
+# CONFIDENT_LABELS label patterns (the Borrower/Homeowner labels) gives a usable name.
+# Pages after that are not read, so a higher-priority label further on no longer wins: "Borrower:
+# John Smith" on page 1 and "Borrower(s): Jane Doe" on page 2 gives John Smith (reading all
+# pages would give Jane Doe). The first confident name in page order is the one used.
+MAX_NAME_PAGES = 20
+CONFIDENT_LABELS = 4
+# The first NAME_SERIAL_PAGES are read one by one (the name is nearly always there); if naming
+# goes on past them, the rest are read by TEXT_WORKERS processes at once (see extract_page_texts)
+NAME_SERIAL_PAGES = 3
+TEXT_WORKERS = DEFAULT_WORKERS
+PARALLEL_TEXT_MIN_PAGES = 8
+_TEXT_POOL = None
+
+def extract_page_texts(doc, first, last, workers=None):
+    """
+    Returns the text of pages first..last-1 of doc, in page order. Longer ranges of a PDF on disk
+    are cut into one contiguous chunk per worker, and each worker process opens the file itself.
+    Reads in this process for short ranges, encrypted or in-memory documents, inside pool
+    workers (a batch is already using every core), and when a worker process has died.
+    """
+    global _TEXT_POOL
+    workers = TEXT_WORKERS if workers is None else workers
+    if (workers <= 1 or last - first < PARALLEL_TEXT_MIN_PAGES or doc.is_encrypted
+            or not doc.name or not os.path.isfile(doc.name) or multiprocessing.parent_process() is not None):
+        return [doc[i].get_text() for i in range(first, last)]
+    if _TEXT_POOL is None:
+        # Kept for the whole session so later files don't pay for starting processes again
+        _TEXT_POOL = ProcessPoolExecutor(max_workers=TEXT_WORKERS)
+    step = -(-(last - first) // workers)
+    try:
+        futures = [_TEXT_POOL.submit(page_range_texts, doc.name, a, min(a + step, last))
+                   for a in range(first, last, step)]
+        return [text for future in futures for text in future.result()]
+    except BrokenProcessPool:
+        # A worker died (e.g. MuPDF crashed on a bad page): drop the pool so the next call starts
+        # a fresh one, and read this range here
+        print("  Text worker died; reading these pages in this process")
+        _TEXT_POOL = None
+        return [doc[i].get_text() for i in range(first, last)]
+
+def _is_skipped_page(page_text):
+    page_start = page_text[:300].lower()
+    # Smarter skip: If a page is instructions, but has borrower info, keep it
+    if any(filter_text in page_start for filter_text in INSTRUCTION_FILTERS):
+        page_lower = page_text.lower()
+        return not (("homeowner name" in page_lower) or ("borrower" in page_lower) or ("applicant" in page_lower))
+    return False
+
+def _name_page_texts(doc):
+    # The first NAME_SERIAL_PAGES one at a time, then the rest of the naming pages in one go (only if asked for)
+    limit = min(MAX_NAME_PAGES, doc.page_count)
+    serial = min(NAME_SERIAL_PAGES, limit)
+    for i in range(serial):
+        yield doc[i].get_text()
+    yield from extract_page_texts(doc, serial, limit)
+
+def iter_name_pages(doc):
+    """
+    Yields the text of the naming pages one at a time, pulling each page from doc only when needed.
+    Instruction pages are skipped; iteration stops after the page where a confident label name appears
+    (see MAX_NAME_PAGES for how that changes which name wins).
+    """
+    first_hits = {}
+    tail = ""
+    for page_text in _name_page_texts(doc):
+        if _is_skipped_page(page_text):
             continue
-        text += page_text
-
-    # --- Helper function: clean and validate candidate name ---
-    def is_valid_name(candidate):
-        candidate_lower = candidate.lower().strip()
-        # Reject if it's a generic label exactly
-        if candidate_lower in generic_labels:
-            return False
-        # Reject if matches any filter term (substring)
-        if any(nb in candidate_lower for nb in not_borrower_filters):
-            return False
-        # Reject if contains digits or odd characters
-        if re.search(r"[^a-zA-Z ,.'&-]", candidate):
-            return False
-        # Reject if too short
-        if len(candidate) < 3:
-            return False
-        return True
+        yield page_text
+        for priority, (pos, raw) in scan_label_hits(tail + page_text).items():
+            first_hits.setdefault(priority, raw)
+        tail = page_text[-PAGE_OVERLAP:]
+        if any(_label_candidate(first_hits[p]) for p in range(CONFIDENT_LABELS) if p in first_hits):
+            return
 
-    # --- Main extraction: try known labels with regex ---
-    name = None
-    patterns = [
-        r"Borrower Information\s*[:\n]+([A-Za-z ,.'&-]+)",
-        r"Borrower\(s\):\s*([A-Za-z ,.'&-]+)",
-        r"Borrower:\s*([A-Za-z ,.'&-]+)",
-        r"Homeowner Name\(s\):\s*([A-Za-z ,.'&-]+)",
-        r"Owner\(s\):\s*([A-Za-z ,.'&-]+)",
-        r"Property Owner\(s\):\s*([A-Za-z ,.'&-]+)",
-        r"Seller\(s\):\s*([A-Za-z ,.'&-]+)",
-        r"Buyer\(s\):\s*([A-Za-z ,.'&-]+)",
-        r"Applicant\(s\):\s*([A-Za-z ,.'&-]+)",
-        r"Client:\s*([A-Za-z ,.'&-]+)",
-        r"Customer:\s*([A-Za-z ,.'&-]+)",
-    ]
-
-    # Try pattern-based extraction
-    for pat in patterns:
-        m = re.search(pat, text, re.IGNORECASE)
-        if m:
-            candidate = m.group(1).split(' and ')[0].split(',')[0].strip()
-            candidate_lower = candidate.lower().strip()
-            if candidate_lower in generic_labels or candidate_lower in not_borrower_filters:
-                continue  # skip generic/filtered names
-            if is_valid_name(candidate):
-                name = candidate
-                break
-
-    # If not found, look for sequences of capitalized words (name heuristics)
-    if not name:
-        cap_name_matches = re.findall(r"\b([A-Z][a-z]+(?: [A-Z][a-z]+)+)\b", text)
-        for cand in cap_name_matches:
-            cand_lower = cand.lower().strip()
-            if cand_lower in generic_labels or cand_lower in not_borrower_filters:
-                continue
-            if is_valid_name(cand):
-                name = cand
-                break
+def find_borrower_name(text):
+    # --- Main extraction: known labels, best priority whose first hit is a usable name ---
+    hits = scan_label_hits(text)
+    for priority in sorted(hits):
+        candidate = _label_candidate(hits[priority][1])
+        if candidate:
+            return candidate
+
+    # If not found, look for sequences of capitalized words (name heuristics); stop at the first good one
+    for m in _CAP_NAME_RE.finditer(text):
+        cand = m.group(1)
+        cand_lower = cand.lower().strip()
+        if cand_lower in GENERIC_LABELS or cand_lower in NOT_BORROWER_SET:
+            continue
+        if is_valid_name(cand):
+            return cand
 
     # Fallback: try all-caps 2-word patterns
-    if not name:
-        acaps = re.findall(r"\n([A-Z]{2,} [A-Z]{2,})\n", text)
-        for acap in acaps:
-            acap_title = acap.title()
-            acap_lower = acap_title.lower().strip()
-            if acap_lower in generic_labels or acap_lower in not_borrower_filters:
-                continue
-            if is_valid_name(acap):
-                name = acap_title
-                break
+    for m in _ALL_CAPS_NAME_RE.finditer(text):
+        acap = m.group(1)
+        acap_title = acap.title()
+        acap_lower = acap_title.lower().strip()
+        if acap_lower in GENERIC_LABELS or acap_lower in NOT_BORROWER_SET:
+            continue
+        if is_valid_name(acap):
+            return acap_title
+    return None
+
+# Helper: extract base filename from PDF content
+def extract_base_filename(pdf_path, doc=None, name_fallback=None):
+    # Reuse the caller's open document when given, otherwise open (and close) our own
+    if doc is None:
+        with fitz.open(pdf_path) as doc:
+            name = detect_borrower_name(doc)
+    else:
+        name = detect_borrower_name(doc)
+    return base_filename_for_name(pdf_path, name, name_fallback)
+
+def detect_borrower_name(doc):
+    # Automatic name only (None if nothing usable); no prompts
+    return find_borrower_name("".join(iter_name_pages(doc)))
 
-    # If no real name is found, always show the manual name prompt as fallback
-    if not name or name.lower().strip() in generic_labels or name.lower().strip() in not_borrower_filters or name.lower() == "unknown":
-        base_name = manual_name_prompt()
+def base_filename_for_name(pdf_path, name, name_fallback=None):
+    # Turns a detected name into (folder, base); asks name_fallback when there is none
+    # If no real name is found, use the fallback (manual name prompt unless told otherwise)
+    if not name or name.lower().strip() in GENERIC_LABELS or name.lower().strip() in NOT_BORROWER_SET or name.lower() == "unknown":
+        base_name = (name_fallback or manual_name_prompt)(pdf_path)
         if base_name:
             folder = BASE_DIR
             date_str = datetime.date.today().strftime("%m%d%Y")
@@ -433,42 +1662,466 @@ def extract_base_filename(pdf_path):
         return folder, f"{borrower_part}_{date_str}"
 
 # —————————————————————————————————————————
-# Logging: Excel + CSV
-def log_action(action_type, filenames, output_path):
-    os.makedirs(BASE_DIR, exist_ok=True)
-
-    # Excel log
-    if not os.path.exists(LOG_EXCEL):
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Log"
-        ws.append(["Date", "Action", "Filenames", "Output Path"])
-    else:
-        wb = load_workbook(LOG_EXCEL)
-        ws = wb["Log"]
+# Analysis cache: detected name + page types per PDF content hash (BASE_DIR/.clio_cache),
+# so re-running an unchanged package skips text extraction and geometry reads
+CACHE_VERSION = 2  # bump when naming or classification rules change
+CACHE_MAX_ENTRIES = 5000
+# The cache usually sits on the share, so it is only scanned for eviction on about one store in
+# CACHE_EVICT_EVERY (picked by content hash, so it evens out across worker processes)
+CACHE_EVICT_EVERY = 50
+
+def _cache_dir():
+    return os.path.join(BASE_DIR, ".clio_cache")
 
+def file_content_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def load_cached_analysis(key, page_count):
+    # Returns (name, page_types) or None; name may be None (no automatic name was found)
+    entry_path = os.path.join(_cache_dir(), f"{key}.json")
+    try:
+        with open(entry_path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        if (entry.get("version") != CACHE_VERSION or entry.get("page_count") != page_count
+                or entry.get("paper_profile") != PAPER_PROFILE):
+            return None
+        # Page types are stored run-length encoded: [["Letter", 12], ["Legal", 3], ...]
+        page_types = b"".join(bytes([PAPER_TYPES.index(tp)]) * n for tp, n in entry["page_types"])
+        if len(page_types) != page_count:
+            return None
+        os.utime(entry_path)  # mark as recently used for LRU eviction
+        return entry.get("name"), page_types
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def store_cached_analysis(key, name, page_types):
+    runs = []
+    for tp in page_types:
+        if runs and runs[-1][0] == PAPER_TYPES[tp]:
+            runs[-1][1] += 1
+        else:
+            runs.append([PAPER_TYPES[tp], 1])
+    entry = {"version": CACHE_VERSION, "name": name, "page_count": len(page_types), "page_types": runs,
+             "paper_profile": PAPER_PROFILE}
+    try:
+        os.makedirs(_cache_dir(), exist_ok=True)
+        entry_path = os.path.join(_cache_dir(), f"{key}.json")
+        with atomic_write(entry_path) as tmp_path, open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        if int(key[:8], 16) % CACHE_EVICT_EVERY == 0:
+            _evict_cache()
+    except OSError as e:
+        print(f"  Could not update analysis cache: {e}")
+
+def _evict_cache():
+    # Least-recently-used entries first until at most CACHE_MAX_ENTRIES are left
+    entries = []
+    with os.scandir(_cache_dir()) as it:
+        for e in it:
+            if e.name.endswith(".json"):
+                entries.append((e.stat().st_mtime, e.path))
+    entries.sort()
+    for _, path in entries[:max(0, len(entries) - CACHE_MAX_ENTRIES)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+# —————————————————————————————————————————
+# Logging: Clio_Log.csv is the master record; Clio_Log.xlsx is rebuilt from it on demand.
+# Several workstations can share BASE_DIR, so nobody appends to Clio_Log.csv directly: each process
+# appends to its own journal in .clio_log/ and journals are folded into Clio_Log.csv by whichever
+# process holds .clio_log/compact.lock. Readers see the master plus any rows still in journals.
+LOG_HEADER = ["Date", "Action", "Filenames", "Output Path", "Borrowers"]
+LOG_LOCK_STALE = 600             # seconds before a lock left by a crashed process is broken
+LOG_JOURNAL_IDLE = 24 * 60 * 60  # other computers' journals untouched this long are compacted too
+_journal_lock = threading.Lock()  # keeps this process's appends out while its journal is compacted
+
+def _log_dir():
+    return os.path.join(BASE_DIR, ".clio_log")
+
+def _journal_files():
+    # Journal paths in .clio_log/, including ones a crashed compactor left half-done
+    if not os.path.isdir(_log_dir()):
+        return []
+    return [os.path.join(_log_dir(), n) for n in sorted(os.listdir(_log_dir()))
+            if n.endswith(".csv") or n.endswith(".compacting")]
+
+def _csv_bytes(rows):
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+def _complete_rows(path):
+    # Bytes of the whole rows in a journal; a row cut short by a crash is left out
+    with open(path, "rb") as f:
+        data = f.read()
+    # csv.writer ends each row with \r\n (fields only contain \n)
+    return data[:data.rfind(b"\r\n") + 2] if b"\r\n" in data else b""
+
+def _seed_csv_from_excel():
+    # One-time migration for installs whose only log is the old workbook
+    from openpyxl import load_workbook  # type: ignore
+    wb = load_workbook(LOG_EXCEL, read_only=True)
+    try:
+        rows = list(wb["Log"].iter_rows(min_row=2, values_only=True))
+    finally:
+        wb.close()
+    with open(LOG_CSV, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(LOG_HEADER)
+        writer.writerows(rows)
+
+def log_action(action_type, filenames, output_path, borrowers=()):
     ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     files_str = ", ".join(filenames)
-    ws.append([ts, action_type, files_str, output_path])
-    wb.save(LOG_EXCEL)
+    borrowers_str = ", ".join(dict.fromkeys(borrowers))
+    row = _csv_bytes([[ts, action_type, files_str, output_path, borrowers_str]])
 
-    # CSV log
-    new_file = not os.path.exists(LOG_CSV)
-    with open(LOG_CSV, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        if new_file:
-            writer.writerow(["Date", "Action", "Filenames", "Output Path"])
-        writer.writerow([ts, action_type, files_str, output_path])
+    # One append to a file only this process writes: no waiting on, or racing with, other desks
+    os.makedirs(_log_dir(), exist_ok=True)
+    with _journal_lock:
+        fd = os.open(os.path.join(_log_dir(), f"{host_tag()}_{os.getpid()}.csv"),
+                     os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, row)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    # Fold it into Clio_Log.csv now unless another desk holds the lock; then it goes in next time
+    try:
+        compact_log_journals(timeout=2)
+    except OSError as e:
+        print(f"  Log compaction skipped: {e}")
+
+def _acquire_log_lock(timeout):
+    # Exclusive create is atomic on SMB as well as local disks; gives up after `timeout` seconds
+    path = os.path.join(_log_dir(), "compact.lock")
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > LOG_LOCK_STALE:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.1)
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(f"{socket.gethostname()} {os.getpid()}\n")
+        return path
+
+def _compactable(path):
+    name = os.path.basename(path)
+    if name.endswith(".compacting"):
+        return True
+    host, _, pid = name[:-len(".csv")].rpartition("_")
+    if host == host_tag() and pid.isdigit():
+        return int(pid) == os.getpid() or not _pid_alive(int(pid))
+    try:
+        return time.time() - os.path.getmtime(path) > LOG_JOURNAL_IDLE
+    except OSError:
+        return False
+
+def _upgrade_log_header():
+    # Logs started before the Borrowers column still have the 4-column header; relabel them once
+    with open(LOG_CSV, "rb") as f:
+        header = f.readline()
+        if header.rstrip(b"\r\n") != _csv_bytes([LOG_HEADER[:4]]).rstrip(b"\r\n"):
+            return
+        with atomic_write(LOG_CSV) as tmp_path, open(tmp_path, "wb") as out:
+            out.write(_csv_bytes([LOG_HEADER]))
+            shutil.copyfileobj(f, out, 1024 * 1024)
+    print(f"  Added the Borrowers column header to {LOG_CSV}")
+
+def compact_log_journals(timeout=10):
+    """
+    Appends finished journal rows to Clio_Log.csv and deletes the journals, under the compaction
+    lock: this process's journal, those of exited processes on this computer, and those of other
+    computers idle for LOG_JOURNAL_IDLE. Returns False if the lock stayed busy for `timeout` seconds.
+    """
+    os.makedirs(_log_dir(), exist_ok=True)
+    lock = _acquire_log_lock(timeout)
+    if not lock:
+        return False
+    try:
+        if not os.path.exists(LOG_CSV) and os.path.exists(LOG_EXCEL):
+            _seed_csv_from_excel()
+        if os.path.exists(LOG_CSV):
+            _upgrade_log_header()
+        for path in _journal_files():
+            if not _compactable(path):
+                continue
+            with _journal_lock:
+                # Renamed first, so a late append from its owner starts a new journal instead of being lost
+                if not path.endswith(".compacting"):
+                    os.replace(path, path + ".compacting")
+                    path += ".compacting"
+                data = _complete_rows(path)
+                if data:
+                    new_file = not os.path.exists(LOG_CSV)
+                    with open(LOG_CSV, "ab") as f:
+                        if new_file:
+                            f.write(_csv_bytes([LOG_HEADER]))
+                        f.write(data)
+                        f.flush()
+                        os.fsync(f.fileno())
+                os.remove(path)
+    finally:
+        os.remove(lock)
+    return True
+
+def _pending_log_rows():
+    # Rows still waiting in journals, oldest first
+    rows = []
+    for path in _journal_files():
+        try:
+            data = _complete_rows(path)
+        except FileNotFoundError:
+            continue  # compacted meanwhile
+        rows += filter(None, map(_log_row, csv.reader(io.StringIO(data.decode("utf-8"), newline=""))))
+    return sorted(rows)
+
+def _log_row(row):
+    # Journal rows written before the Borrowers column have only four fields
+    if len(row) == 4:
+        row = row + [""]
+    return tuple(row) if len(row) == 5 else None
+
+def read_log_rows():
+    # Yields (date, action, filenames, output, borrowers) from Clio_Log.csv, then rows still in journals
+    if os.path.exists(LOG_CSV):
+        with open(LOG_CSV, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # header
+            for row in reader:
+                row = _log_row(row)
+                if row:
+                    yield row
+    yield from _pending_log_rows()
+
+# --- Indexed log (LOG_DB, on local disk): a query index over the CSV log, safe to delete ---
+LOG_PAGE_SIZE = 100
+
+def _open_log_db():
+    os.makedirs(os.path.dirname(LOG_DB), exist_ok=True)
+    con = sqlite3.connect(LOG_DB)
+    con.executescript("""
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS log (
+            id INTEGER PRIMARY KEY, date TEXT, action TEXT,
+            filenames TEXT, output TEXT, borrowers TEXT, pending INTEGER DEFAULT 0);
+        CREATE TABLE IF NOT EXISTS log_files (entry_id INTEGER, filename TEXT);
+        CREATE TABLE IF NOT EXISTS log_borrowers (entry_id INTEGER, borrower TEXT);
+        CREATE INDEX IF NOT EXISTS log_date ON log (date);
+        CREATE INDEX IF NOT EXISTS log_action_date ON log (action, date);
+        CREATE INDEX IF NOT EXISTS log_files_name ON log_files (filename, entry_id);
+        CREATE INDEX IF NOT EXISTS log_borrowers_name ON log_borrowers (borrower, entry_id);
+    """)
+    return con
+
+def _index_log_rows(con, rows, pending=0):
+    for row in rows:
+        cur = con.execute("INSERT INTO log (date, action, filenames, output, borrowers, pending) "
+                          "VALUES (?, ?, ?, ?, ?, ?)", row + (pending,))
+        entry_id = cur.lastrowid
+        con.executemany("INSERT INTO log_files VALUES (?, ?)",
+                        [(entry_id, fn.strip().lower()) for fn in row[2].split(",") if fn.strip()])
+        con.executemany("INSERT INTO log_borrowers VALUES (?, ?)",
+                        [(entry_id, b.strip().lower()) for b in row[4].split(",") if b.strip()])
+
+def sync_log_index():
+    """
+    Brings the log index up to date with Clio_Log.csv by reading only the bytes appended since
+    the last sync (the byte offset is kept in the meta table), then swaps in the rows still
+    waiting in journals. Returns the open connection.
+    """
+    con = _open_log_db()
+    _sync_log_master(con)
+    pending = _pending_log_rows()
+    with con:
+        for table, column in (("log_files", "entry_id"), ("log_borrowers", "entry_id")):
+            con.execute(f"DELETE FROM {table} WHERE {column} IN (SELECT id FROM log WHERE pending = 1)")
+        con.execute("DELETE FROM log WHERE pending = 1")
+        _index_log_rows(con, pending, pending=1)
+    return con
+
+def _sync_log_master(con):
+    row = con.execute("SELECT value FROM meta WHERE key = 'csv_offset'").fetchone()
+    offset = int(row[0]) if row else 0
+    row = con.execute("SELECT value FROM meta WHERE key = 'csv_header'").fetchone()
+    indexed_header = row[0] if row else None
+    size = os.path.getsize(LOG_CSV) if os.path.exists(LOG_CSV) else 0
+    header = ""
+    if size:
+        with open(LOG_CSV, "rb") as f:
+            header = f.readline().decode("utf-8", "replace")
+    if size < offset or (offset and header != indexed_header):
+        # Log was replaced, truncated or had its header rewritten: re-index from scratch
+        with con:
+            con.execute("DELETE FROM log")
+            con.execute("DELETE FROM log_files")
+            con.execute("DELETE FROM log_borrowers")
+        offset = 0
+    if size == offset:
+        return
+
+    with open(LOG_CSV, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    # Only index complete rows; csv.writer ends each row with \r\n (fields only contain \n)
+    end = data.rfind(b"\r\n")
+    if end < 0:
+        return
+    data = data[:end + 2]
+    rows = csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+    if offset == 0:
+        next(rows, None)  # header
+    with con:
+        _index_log_rows(con, filter(None, map(_log_row, rows)))
+        con.execute("INSERT OR REPLACE INTO meta VALUES ('csv_offset', ?)", (str(offset + len(data)),))
+        con.execute("INSERT OR REPLACE INTO meta VALUES ('csv_header', ?)", (header,))
+
+def _prefix_range(column, text):
+    # Case-insensitive prefix match as an index-friendly range: text <= column < text + U+10FFFF
+    text = text.lower()
+    return f"{column} >= ? AND {column} < ?", [text, text + "\U0010ffff"]
+
+def query_log(date_from=None, date_to=None, action=None, borrower=None, filename=None,
+              limit=LOG_PAGE_SIZE, offset=0):
+    """
+    Returns (rows, total) from the indexed log, newest first. Dates are YYYY-MM-DD (inclusive);
+    borrower ("Smith" or "Smith_J") and filename match by prefix, ignoring case.
+    """
+    con = sync_log_index()
+    try:
+        where, params = [], []
+        if date_from:
+            where.append("date >= ?"); params.append(date_from)
+        if date_to:
+            where.append("date < ?"); params.append(date_to + "~")  # "~" sorts after the time part
+        if action:
+            where.append("action = ?"); params.append(action)
+        if borrower:
+            cond, p = _prefix_range("borrower", borrower)
+            where.append(f"id IN (SELECT entry_id FROM log_borrowers WHERE {cond})"); params += p
+        if filename:
+            cond, p = _prefix_range("filename", filename)
+            where.append(f"id IN (SELECT entry_id FROM log_files WHERE {cond})"); params += p
+        clause = (" WHERE " + " AND ".join(where)) if where else ""
+        total = con.execute(f"SELECT COUNT(*) FROM log{clause}", params).fetchone()[0]
+        rows = con.execute(
+            f"SELECT date, action, filenames, output, borrowers FROM log{clause} "
+            f"ORDER BY date DESC, id DESC LIMIT ? OFFSET ?", params + [limit, offset]).fetchall()
+        return rows, total
+    finally:
+        con.close()
+
+def export_log_excel(force=False):
+    """
+    Materializes Clio_Log.xlsx from the CSV log if it is missing or older than the log (journals
+    are compacted first). Streams rows with a write-only workbook and swaps the file in atomically,
+    so desks exporting at the same time each write a whole workbook. Returns the path.
+    """
+    compact_log_journals()
+    sources = [p for p in [LOG_CSV] + _journal_files() if os.path.exists(p)]
+    if not sources:
+        return None
+    if (not force and os.path.exists(LOG_EXCEL)
+            and os.path.getmtime(LOG_EXCEL) >= max(os.path.getmtime(p) for p in sources)):
+        return LOG_EXCEL
+    from openpyxl import Workbook  # type: ignore
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Log")
+    ws.append(LOG_HEADER)
+    for row in read_log_rows():
+        ws.append(list(row))
+    with atomic_write(LOG_EXCEL) as tmp_path:
+        wb.save(tmp_path)
+    print(f"  Saving log workbook: {LOG_EXCEL}")
+    return LOG_EXCEL
 
 # —————————————————————————————————————————
+# Paper sizes: which page sizes go to which output bucket.
+# Sizes are in inches and match in either orientation; the first matching size wins and pages
+# matching no size go to "Other". BASE_DIR/Clio_Paper_Sizes.json can add sizes (or replace a
+# default by name), e.g. {"paper_sizes": [{"name": "A4", "width": 8.27, "height": 11.69, "bucket": "A4"}]}
+DEFAULT_PAPER_SIZES = [
+    {"name": "Letter", "width": 8.5, "height": 11, "tolerance": 0.2, "bucket": "Letter"},
+    {"name": "Legal", "width": 8.5, "height": 14, "tolerance": 0.2, "bucket": "Legal"},
+]
+DEFAULT_TOLERANCE = 0.2
+# Page types are kept as one byte per page: PAPER_TYPES[code] is the bucket name.
+# Letter, Legal and Other always come first; extra buckets follow in config order.
+LETTER, LEGAL, OTHER = range(3)
+_BUCKET_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9 -]*$")
+
+def load_paper_sizes(path):
+    # Defaults plus the sizes from path (if it exists); a bad config is reported and ignored
+    sizes = [dict(size) for size in DEFAULT_PAPER_SIZES]
+    if not os.path.exists(path):
+        return sizes
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            extra = json.load(f)["paper_sizes"]
+        for size in extra:
+            size = {"name": str(size["name"]), "width": float(size["width"]), "height": float(size["height"]),
+                    "tolerance": float(size.get("tolerance", DEFAULT_TOLERANCE)),
+                    "bucket": str(size.get("bucket", size["name"]))}
+            if not _BUCKET_NAME_RE.match(size["bucket"]) or size["bucket"] in ("Full", "Summary"):
+                raise ValueError(f"bad bucket name {size['bucket']!r}")
+            names = [s["name"] for s in sizes]
+            if size["name"] in names:
+                sizes[names.index(size["name"])] = size
+            else:
+                sizes.append(size)
+        return sizes
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Ignoring paper size config {path}: {e}")
+        return [dict(size) for size in DEFAULT_PAPER_SIZES]
+
+def apply_paper_sizes(sizes):
+    # Builds the lookup tables used for every page: runs once at startup / set_base_dir
+    global PAPER_SIZES, PAPER_TYPES, PAPER_PROFILE, _SIZE_TABLE, _SIZE_CODES
+    buckets = ["Letter", "Legal", "Other"]
+    for size in sizes:
+        if size["bucket"] not in buckets:
+            buckets.append(size["bucket"])
+    PAPER_SIZES = sizes
+    PAPER_TYPES = tuple(buckets)
+    # Signature of the active sizes, stored with cached page types
+    PAPER_PROFILE = hashlib.sha256(json.dumps(sizes, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    # (short side, long side, tolerance, bucket code) per size, in inches
+    _SIZE_TABLE = [(min(s["width"], s["height"]), max(s["width"], s["height"]), s["tolerance"],
+                    PAPER_TYPES.index(s["bucket"])) for s in sizes]
+    # Scanned packages use a handful of distinct page sizes; remember each one's code
+    _SIZE_CODES = {}
+
+def _size_code(w_pts, h_pts):
+    code = _SIZE_CODES.get((w_pts, h_pts))
+    if code is None:
+        w_in, h_in = sorted([w_pts/72, h_pts/72])
+        code = next((code for size_w, size_h, tolerance, code in _SIZE_TABLE
+                     if abs(h_in-size_h) < tolerance and abs(w_in-size_w) < tolerance), OTHER)
+        if len(_SIZE_CODES) > 4096:
+            _SIZE_CODES.clear()
+        _SIZE_CODES[(w_pts, h_pts)] = code
+    return code
+
 # Helper to classify paper type
 def get_paper_type(w_pts, h_pts):
-    w_in, h_in = sorted([w_pts/72, h_pts/72])
-    if abs(h_in-11) < 0.2 and abs(w_in-8.5) < 0.2:
-        return "Letter"
-    if abs(h_in-14) < 0.2 and abs(w_in-8.5) < 0.2:
-        return "Legal"
-    return "Other"
+    return PAPER_TYPES[_size_code(w_pts, h_pts)]
+
+apply_paper_sizes(load_paper_sizes(PAPER_SIZES_FILE))
 
 # Show scrollable window with all selected files
 def show_selected_files_window(file_paths, action="Files Selected"):
@@ -480,48 +2133,129 @@ def show_selected_files_window(file_paths, action="Files Selected"):
     st.insert(tk.END, "\n".join(file_paths))
     st.config(state=tk.DISABLED)
 
-# Create a numbered marker PDF page using PyMuPDF
-def create_marker_pdf(page_number, width=8.5*72, height=11*72):
-    doc = fitz.open()
-    page = doc.new_page(width=width, height=height)
-    text = f"Marker Page {page_number}"
-    rect = fitz.Rect(72, height/2-20, width-72, height/2+20)
-    page.insert_textbox(rect, text, fontsize=36, color=(0, 0, 0), align=1)
-    # Save to memory, return raw bytes
-    pdf_bytes = doc.write()
-    doc.close()
-    return pdf_bytes
+# Numbered marker pages (one per Legal block in the Letter output).
+# The static part of the page is rendered once into a template; each marker is a copy of it plus a
+# one-line content stream that draws the number with the template's font.
+MARKER_WIDTH, MARKER_HEIGHT = 8.5*72, 11*72
+MARKER_FONTSIZE = 36
+_marker_template = None  # (template doc, font resource name), built on first use in each process
+
+def marker_template():
+    global _marker_template
+    if _marker_template is None:
+        doc = fitz.open()
+        page = doc.new_page(width=MARKER_WIDTH, height=MARKER_HEIGHT)
+        rect = fitz.Rect(72, MARKER_HEIGHT/2-90, MARKER_WIDTH-72, MARKER_HEIGHT/2-20)
+        page.insert_textbox(rect, "Marker Page", fontsize=MARKER_FONTSIZE, fontname="helv", color=(0, 0, 0), align=1)
+        _marker_template = (doc, page.get_fonts()[0][4])
+    return _marker_template
+
+def add_marker_page(out, number):
+    # Appends marker page `number` to out. With final=0 the template's font object is grafted into
+    # out once and shared by every marker page in it.
+    template, font = marker_template()
+    out.insert_pdf(template, final=0)
+    page_xref = out.page_xref(len(out) - 1)
+    text = str(number)
+    x = (MARKER_WIDTH - fitz.get_text_length(text, fontname="helv", fontsize=MARKER_FONTSIZE)) / 2
+    y = MARKER_HEIGHT/2 - 20  # baseline 20pt below the middle (PDF y grows upward)
+    stamp = out.get_new_xref()
+    out.update_object(stamp, "<<>>")
+    out.update_stream(stamp, f"BT /{font} {MARKER_FONTSIZE} Tf {x:.2f} {y:.2f} Td ({text}) Tj ET".encode())
+    kind, contents = out.xref_get_key(page_xref, "Contents")
+    if kind == "array":
+        contents = contents[1:-1]
+    elif kind == "null":
+        contents = ""
+    out.xref_set_key(page_xref, "Contents", f"[{contents} {stamp} 0 R]")
 
 # Log viewer
+LOG_RANGES = {"All dates": None, "Today": 0, "Last 7 days": 7, "Last 30 days": 30, "Last 365 days": 365}
+
 def view_log():
-    if not os.path.exists(LOG_EXCEL):
+    try:
+        compact_log_journals(timeout=2)
+    except OSError:
+        pass  # the viewer also reads rows still in journals
+    if not os.path.exists(LOG_CSV) and not _journal_files():
         messagebox.showerror("Log Missing", "No log file found.")
         return
 
-    def do_filter():
-        date_f = date_entry.get().strip()
+    page = {"offset": 0, "total": 0}
+
+    def apply_range(event=None):
+        days = LOG_RANGES[range_var.get()]
+        from_entry.delete(0, tk.END)
+        to_entry.delete(0, tk.END)
+        if days is not None:
+            from_entry.insert(0, (datetime.date.today() - datetime.timedelta(days=days)).isoformat())
+
+    def show_page():
         act_f = action_var.get()
-        wb = load_workbook(LOG_EXCEL)
-        ws = wb["Log"]
+        rows, page["total"] = query_log(
+            date_from=from_entry.get().strip() or None,
+            date_to=to_entry.get().strip() or None,
+            action=None if act_f == "All" else act_f,
+            borrower=borrower_entry.get().strip() or None,
+            filename=file_entry.get().strip() or None,
+            offset=page["offset"])
         results.delete(1.0, tk.END)
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            date, action, files, outp = row
-            if (not date_f or date_f in date) and (act_f == "All" or act_f == action):
-                results.insert(tk.END, f"{date} | {action}\nFiles: {files}\n→ {outp}\n\n")
+        for date, action, files, outp, borrowers in rows:
+            who = f" | {borrowers}" if borrowers else ""
+            results.insert(tk.END, f"{date} | {action}{who}\nFiles: {files}\n→ {outp}\n\n")
+        last = min(page["offset"] + LOG_PAGE_SIZE, page["total"])
+        page_label.config(text=f"{page['offset'] + 1 if rows else 0}–{last} of {page['total']}")
+
+    def do_filter():
+        page["offset"] = 0
+        show_page()
+
+    def prev_page():
+        if page["offset"] > 0:
+            page["offset"] = max(0, page["offset"] - LOG_PAGE_SIZE)
+            show_page()
+
+    def next_page():
+        if page["offset"] + LOG_PAGE_SIZE < page["total"]:
+            page["offset"] += LOG_PAGE_SIZE
+            show_page()
 
     top = tk.Toplevel()
     top.title("Clio Log Viewer")
-    top.geometry("600x500")
+    top.geometry("760x560")
     frm = tk.Frame(top); frm.pack(pady=10)
-    tk.Label(frm, text="Date (YYYY-MM-DD):").grid(row=0, column=0)
-    date_entry = tk.Entry(frm, width=15); date_entry.grid(row=0, column=1, padx=5)
-    tk.Label(frm, text="Action:").grid(row=0, column=2)
+    range_var = tk.StringVar(value="All dates")
+    range_box = ttk.Combobox(frm, textvariable=range_var, values=list(LOG_RANGES),
+                             state="readonly", width=13)
+    range_box.grid(row=0, column=0, padx=5)
+    range_box.bind("<<ComboboxSelected>>", apply_range)
+    tk.Label(frm, text="From:").grid(row=0, column=1)
+    from_entry = tk.Entry(frm, width=11); from_entry.grid(row=0, column=2, padx=5)
+    tk.Label(frm, text="To:").grid(row=0, column=3)
+    to_entry = tk.Entry(frm, width=11); to_entry.grid(row=0, column=4, padx=5)
+    tk.Label(frm, text="Action:").grid(row=0, column=5)
     action_var = tk.StringVar(value="All")
     ttk.Combobox(frm, textvariable=action_var, values=["All", "Merge", "Process"],
-                 state="readonly", width=10).grid(row=0, column=3, padx=5)
-    tk.Button(frm, text="Filter", command=do_filter).grid(row=0, column=4, padx=10)
+                 state="readonly", width=10).grid(row=0, column=6, padx=5)
+    tk.Label(frm, text="Borrower:").grid(row=1, column=0, pady=4)
+    borrower_entry = tk.Entry(frm, width=14); borrower_entry.grid(row=1, column=1, columnspan=2, padx=5)
+    tk.Label(frm, text="File:").grid(row=1, column=3)
+    file_entry = tk.Entry(frm, width=14); file_entry.grid(row=1, column=4, columnspan=2, padx=5)
+    tk.Button(frm, text="Filter", command=do_filter).grid(row=1, column=6, padx=10)
+
+    def do_export():
+        path = export_log_excel(force=True)
+        messagebox.showinfo("Log Exported", f"Excel log written to:\n{path}", parent=top)
+
+    tk.Button(frm, text="Export Excel", command=do_export).grid(row=0, column=7, padx=5)
+    nav = tk.Frame(top); nav.pack()
+    tk.Button(nav, text="◀ Prev", command=prev_page).grid(row=0, column=0, padx=5)
+    page_label = tk.Label(nav, text="")
+    page_label.grid(row=0, column=1, padx=10)
+    tk.Button(nav, text="Next ▶", command=next_page).grid(row=0, column=2, padx=5)
     results = scrolledtext.ScrolledText(top, wrap=tk.WORD)
     results.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    show_page()
 
 
 def process_pdfs_individually():
@@ -535,9 +2269,13 @@ def process_pdfs_individually():
 # —————————————————————————————————————————
 # GUI
 def main():
-    show_intake_window()
+    print("CLIO: This is the current development version running.")
+    # Startup measurement mode: launch, record the timings, quit (also via CLIO_STARTUP_TIME=1 for the app bundle)
+    measure_startup = "--startup-time" in sys.argv[1:] or bool(os.environ.get("CLIO_STARTUP_TIME"))
+    show_intake_window(measure_startup)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # worker processes inside the py2app bundle
     try:
         main()
     except Exception:
@@ -0,0 +1,258 @@
+# Headless batch entry point: split/name/log PDFs without any Tk dialogs.
+#
+#   python3 clio_cli.py --signing-date 2024-05-01 ~/Scans/inbox
+#   python3 clio_cli.py --base-dir "/Volumes/Share/MAB Law LLC" --name-fallback filename "~/Scans/*.pdf"
+#   python3 clio_cli.py --watch "/Volumes/Share/Scanner Inbox"
+#
+# One JSON object per input file is printed to stdout; progress chatter goes to stderr.
+
+import argparse
+import contextlib
+import datetime
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Some PyMuPDF builds print a notice on import; keep stdout for the JSON lines only
+with contextlib.redirect_stdout(sys.stderr):
+    import clio_app
+    from clio_common import expand_inputs, move_pdf, read_config_base_dir, staging_dir_from_config
+
+
+def signing_date(value):
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a YYYY-MM-DD date: {value!r}")
+
+
+def page_window(value):
+    try:
+        n = int(value)
+    except ValueError:
+        n = -1
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"not a page count (0 or more): {value!r}")
+    return n
+
+
+def pdf_is_complete(path):
+    # A PDF is fully written once its last bytes contain the %%EOF trailer marker
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 1024))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+
+def file_original(path, folder, result):
+    # Moves a finished original into processed/ or failed/ inside its watch folder; a failed one
+    # gets a .error.txt beside it. Returns the new path.
+    ok = result["status"] == "ok"
+    moved_to = move_pdf(path, os.path.join(folder, "processed" if ok else "failed"), os.path.basename(path))
+    if not ok:
+        try:
+            with open(moved_to + ".error.txt", "w", encoding="utf-8") as f:
+                f.write(result["summary"])
+        except OSError as e:
+            print(f"Could not write {moved_to}.error.txt: {e}")
+    return moved_to
+
+
+def watch_folders(folders, signing_date, name_fallback, workers, options, settle=5.0, poll=2.0,
+                  log=True, once=False, out=sys.stdout):
+    """
+    Processes PDFs as they land in folders (e.g. a scanner inbox). A file is picked up once its size
+    and mtime have not changed for `settle` seconds and it ends with %%EOF (or has been unchanged for
+    10 x settle, in case it never will), runs through process_single_pdf on a pool of `workers`
+    processes, and is then moved into processed/ or failed/ inside its folder (failures get a
+    .error.txt beside them). Results go to out as JSON lines, and the files finished in each poll
+    are logged as one "Process" entry. Errors reading a folder, moving a file or logging (e.g. the
+    share dropping out) are reported and retried on the next poll instead of stopping the watch.
+    With once, returns when there is nothing left to pick up. Returns the number of files that failed.
+    """
+    seen = {}      # path → ((size, mtime), when that signature was first seen)
+    running = {}   # future → (path, folder)
+    unmoved = {}   # path → (folder, result) of finished files whose move failed; retried each poll
+    failed = 0
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=clio_app._init_worker,
+                               initargs=(clio_app.BASE_DIR, clio_app.STAGING_DIR))
+    print(f"Watching {', '.join(folders)} (Ctrl-C to stop)")
+    try:
+        while True:
+            now = time.monotonic()
+            for path, (folder, result) in list(unmoved.items()):
+                try:
+                    print(f"Moved {path} to {file_original(path, folder, result)}")
+                except FileNotFoundError:
+                    pass  # someone else moved or deleted it
+                except OSError:
+                    continue
+                del unmoved[path]
+            busy = {path for path, _ in running.values()} | set(unmoved)
+            present = set()
+            unreadable = False
+            for folder in folders:
+                try:
+                    with os.scandir(folder) as it:
+                        entries = list(it)
+                except OSError as e:
+                    print(f"Cannot read {folder}: {e}; retrying")
+                    unreadable = True
+                    present.update(p for p in seen if os.path.dirname(p) == folder)  # keep their settle times
+                    continue
+                for entry in entries:
+                    if entry.path in busy or not entry.name.lower().endswith(".pdf"):
+                        continue
+                    present.add(entry.path)
+                    try:
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue  # moved or deleted while scanning
+                    signature = (st.st_size, st.st_mtime_ns)
+                    if seen.get(entry.path, (None,))[0] != signature:
+                        seen[entry.path] = (signature, now)
+                        continue
+                    stable_for = now - seen[entry.path][1]
+                    if stable_for >= settle and (pdf_is_complete(entry.path) or stable_for >= 10 * settle):
+                        del seen[entry.path]
+                        print(f"Queued: {entry.path}")
+                        future = pool.submit(clio_app.process_single_pdf, entry.path, signing_date, name_fallback,
+                                             **options)
+                        running[future] = (entry.path, folder)
+            # Forget files that went away before settling (e.g. a scanner's temp file renamed on completion)
+            for path in [p for p in seen if p not in present]:
+                del seen[path]
+
+            finished = [future for future in running if future.done()]
+            names, log_txt, borrowers = [], "", []
+            for future in finished:
+                path, folder = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = clio_app._error_result(path, e)
+                failed += result["status"] != "ok"
+                result["moved_to"] = None
+                try:
+                    result["moved_to"] = file_original(path, folder, result)
+                except FileNotFoundError:
+                    print(f"{path} went away while it was being processed")
+                except OSError as e:
+                    print(f"Could not move {path} yet: {e}; retrying")
+                    unmoved[path] = (folder, result)
+                names.append(os.path.basename(path))
+                log_txt += result["summary"]
+                if result["borrower"]:
+                    borrowers.append(result["borrower"])
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+            if names and log:
+                try:
+                    clio_app.log_action("Process", names, log_txt, borrowers)
+                except OSError as e:
+                    print(f"Could not log {', '.join(names)}: {e}")
+
+            if once and not running and not seen and not unmoved and not unreadable:
+                return failed
+            time.sleep(poll)
+    except KeyboardInterrupt:
+        print("Stopping watch; files still queued stay in the inbox.")
+        return failed
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="clio", description="Split, name and log PDFs without the GUI.")
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns (with --watch: folders)")
+    parser.add_argument("--signing-date", type=signing_date,
+                        help="date of signing written to each _Summary.txt (YYYY-MM-DD)")
+    parser.add_argument("--base-dir",
+                        help="output/log root (default: ~/.clio_config.json base_dir, else the clio_app default)")
+    parser.add_argument("--stage-dir", metavar="DIR",
+                        help="build outputs in DIR and copy them to the base dir when each file is done "
+                             "(default: the ~/.clio_config.json staging folder when the base dir comes from there)")
+    parser.add_argument("--name-fallback", choices=["skip", "filename"], default="skip",
+                        help="what to do when no borrower name is found (default: skip the file)")
+    parser.add_argument("--jobs", "-j", type=int, default=clio_app.DEFAULT_WORKERS,
+                        help=f"files to process in parallel (default: {clio_app.DEFAULT_WORKERS})")
+    parser.add_argument("--normalize-full", action="store_true",
+                        help="re-serialize _Full.pdf through PyMuPDF instead of copying the input file")
+    parser.add_argument("--page-window", type=page_window, metavar="N",
+                        help="write outputs N pages at a time to bound memory (0 = off; default: automatic for big files)")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep watching the input folders and process PDFs as they arrive; originals are "
+                             "moved to processed/ or failed/ inside each folder")
+    parser.add_argument("--settle", type=float, default=5.0, metavar="SECONDS",
+                        help="with --watch: how long a file must stay unchanged before it is picked up (default: 5)")
+    parser.add_argument("--poll", type=float, default=2.0, metavar="SECONDS",
+                        help="with --watch: seconds between folder scans (default: 2)")
+    parser.add_argument("--once", action="store_true",
+                        help="with --watch: exit once the folders have nothing left to process")
+    parser.add_argument("--no-log", action="store_true", help="don't append the batch to Clio_Log")
+    parser.add_argument("--export-log", action="store_true",
+                        help="rebuild Clio_Log.xlsx from the CSV journal when the batch is done")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # set_base_dir also loads the paper size config, which may print a warning
+    with contextlib.redirect_stdout(sys.stderr):
+        clio_app.set_base_dir(os.path.expanduser(args.base_dir or read_config_base_dir() or clio_app.BASE_DIR))
+    if args.stage_dir:
+        clio_app.set_staging_dir(os.path.expanduser(args.stage_dir))
+    elif not args.base_dir and read_config_base_dir():
+        clio_app.set_staging_dir(staging_dir_from_config())
+    name_fallback = clio_app.NAME_FALLBACKS[args.name_fallback]
+
+    if args.watch:
+        folders = [os.path.expanduser(f) for f in args.inputs]
+        missing = [f for f in folders if not os.path.isdir(f)]
+        if missing:
+            build_parser().error(f"--watch needs folders: {', '.join(missing)}")
+        options = {"normalize_full": args.normalize_full, "page_window": args.page_window}
+        out = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            failed = watch_folders(folders, args.signing_date, name_fallback, max(1, args.jobs), options,
+                                   args.settle, args.poll, not args.no_log, args.once, out)
+            if args.export_log:
+                clio_app.export_log_excel()
+        return 1 if failed else 0
+
+    file_paths = expand_inputs(args.inputs)
+    out = sys.stdout
+    log_txt = ""
+    borrowers = []
+    failed = 0
+    # clio_app prints progress with print(); keep stdout clean for the JSON lines
+    with contextlib.redirect_stdout(sys.stderr):
+        dates = [args.signing_date] * len(file_paths)
+        for result in clio_app.iter_batch_results(file_paths, dates, name_fallback, workers=args.jobs,
+                                                  normalize_full=args.normalize_full,
+                                                  page_window=args.page_window):
+            log_txt += result["summary"]
+            failed += result["status"] == "error"
+            if result["borrower"]:
+                borrowers.append(result["borrower"])
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+        if file_paths and not args.no_log:
+            clio_app.log_action("Process", [os.path.basename(f) for f in file_paths], log_txt, borrowers)
+        if args.export_log:
+            clio_app.export_log_excel()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
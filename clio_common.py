@@ -0,0 +1,136 @@
+# Helpers shared by the app, the headless CLI and pdf_namer. No tkinter here, so the
+# command-line tools run on a Python built without Tk (e.g. a server doing overnight batches).
+
+import contextlib
+import errno
+import glob
+import json
+import os
+import re
+import shutil
+import socket
+import sys
+
+# --- Config handling for "dad version" ---
+# ClioSMB and the CLI take BASE_DIR from ~/.clio_config.json (usually a shared SMB folder).
+CONFIG_PATH = os.path.expanduser("~/.clio_config.json")
+
+def read_config():
+    # Returns the config dict, or {} if it is missing or unreadable
+    if os.path.exists(CONFIG_PATH):
+        try:
+            with open(CONFIG_PATH, "r") as f:
+                cfg = json.load(f)
+            if isinstance(cfg, dict):
+                return cfg
+        except Exception:
+            pass  # Ignore config errors and reprompt
+    return {}
+
+def read_config_base_dir():
+    # Returns the configured base_dir, or None if there is no usable config (never prompts)
+    cfg = read_config()
+    if "base_dir" in cfg and os.path.exists(cfg["base_dir"]):
+        return cfg["base_dir"]
+    return None
+
+def local_data_dir():
+    # Per-user folder on this computer's own disk, for files that must not live on a network share
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/Agent Clio")
+    return os.path.expanduser("~/.cache/clio")
+
+def host_tag():
+    # This computer's name, safe to use in file names on a shared folder
+    return re.sub(r"[^A-Za-z0-9.-]", "-", socket.gethostname())
+
+@contextlib.contextmanager
+def atomic_write(path):
+    """
+    Yields a temporary path beside path to write the new file to. When the block ends, the file is
+    fsynced and renamed over path, so other readers, a crash or a power cut see either the old file
+    or the complete new one. If the block raises, the temporary file is removed.
+    """
+    tmp_path = f"{path}.{host_tag()}.{os.getpid()}.tmp"
+    try:
+        yield tmp_path
+        fd = os.open(tmp_path, os.O_RDWR)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def staging_dir_from_config(cfg=None):
+    # Local folder where job outputs are built before being copied to the share.
+    # "staging": false in the config turns this off; "staging_dir" picks another folder.
+    cfg = read_config() if cfg is None else cfg
+    if cfg.get("staging") is False:
+        return None
+    if cfg.get("staging_dir"):
+        return os.path.expanduser(cfg["staging_dir"])
+    return os.path.join(local_data_dir(), "Staging")
+
+# --- Inputs, page text and moving files ---
+PAGE_OVERLAP = 200  # chars carried over so a label split across a page break is still seen
+
+def expand_inputs(patterns):
+    # Accept files, directories (every *.pdf directly inside) and glob patterns; keep order, drop dupes
+    paths = []
+    for pat in patterns:
+        pat = os.path.expanduser(pat)
+        if os.path.isdir(pat):
+            matches = sorted(os.path.join(pat, n) for n in os.listdir(pat) if n.lower().endswith(".pdf"))
+        elif glob.has_magic(pat):
+            matches = sorted(glob.glob(pat))
+        else:
+            matches = [pat]
+        for m in matches:
+            if m not in paths:
+                paths.append(m)
+    return paths
+
+def page_range_texts(path, first, last):
+    # Worker task: opens its own copy of the PDF and returns the text of pages first..last-1
+    import fitz  # PyMuPDF; only loaded by the processes that read pages
+    with fitz.open(path) as doc:
+        return [doc[i].get_text() for i in range(first, last)]
+
+def move_pdf(src, destination_folder, filename):
+    """
+    Moves src into destination_folder as filename, or as "name (1).pdf", "name (2).pdf", ... if that
+    is taken. The name is claimed with an exclusive create, so an existing file is never overwritten,
+    and a move to another filesystem is done as copy-then-delete. Returns the new path.
+    """
+    os.makedirs(destination_folder, exist_ok=True)
+    stem, ext = os.path.splitext(filename)
+    n = 0
+    while True:
+        target = os.path.join(destination_folder, filename if n == 0 else f"{stem} ({n}){ext}")
+        if os.path.abspath(target) == os.path.abspath(src):
+            return target  # already has this name
+        try:
+            os.close(os.open(target, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+            break
+        except FileExistsError:
+            n += 1
+    try:
+        os.replace(src, target)  # replaces only the empty placeholder claimed above
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            os.remove(target)
+            raise
+        try:
+            shutil.copyfile(src, target)
+            shutil.copystat(src, target)
+        except BaseException:
+            os.remove(target)
+            raise
+        os.remove(src)
+    return target
@@ -1,61 +1,148 @@
 import fitz  # PyMuPDF
 import re
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-def extract_info_from_pdf(pdf_path):
-    doc = fitz.open(pdf_path)
-    text = ""
-    for page in doc:
-        text += page.get_text()
+from clio_common import PAGE_OVERLAP, expand_inputs, move_pdf, page_range_texts
+
+# Documents of PARALLEL_MIN_PAGES or more are read by WORKERS processes, PAGE_WINDOW pages at a time
+WORKERS = os.cpu_count() or 1
+PARALLEL_MIN_PAGES = 16
+PAGE_WINDOW = 8
+# The header fields are normally on the first pages: read these one at a time before going wide
+SERIAL_PAGES = 4
+
+FILE_NUMBER_RE = re.compile(r'File Number: ([A-Z\-0-9]+)')
+NAMES_RE = re.compile(r'Homeowner Name\(s\): (.+)')
+DATE_RE = re.compile(r'Date: ([A-Za-z]+\s\d{1,2},\s\d{4})')
+# Checked in this order; the first one found names the document
+DOC_TYPES = [
+    ("Forward Sale Option and Exchange Agreement", "ForwardSaleAgreement"),
+    ("Compliance Agreement", "ComplianceAgreement"),
+    ("Affidavit", "Affidavit"),
+]
+
+def iter_page_texts(pdf_path, workers=WORKERS):
+    """
+    Page texts in order, pulled only as needed. After SERIAL_PAGES, pages are read in windows of
+    PAGE_WINDOW by a process pool that keeps only `workers` windows ahead of the reader, so a caller
+    that stops early leaves the rest of the document unread.
+    """
+    with fitz.open(pdf_path) as doc:
+        page_count = doc.page_count
+        for i in range(min(SERIAL_PAGES, page_count)):
+            yield doc[i].get_text()
+        rest = page_count - SERIAL_PAGES
+        if rest <= 0:
+            return
+        if workers <= 1 or rest < PARALLEL_MIN_PAGES:
+            for i in range(SERIAL_PAGES, page_count):
+                yield doc[i].get_text()
+            return
+    pool = ProcessPoolExecutor(max_workers=workers)
+    ahead = deque()
+    try:
+        for first in range(SERIAL_PAGES, page_count, PAGE_WINDOW):
+            ahead.append(pool.submit(page_range_texts, pdf_path, first, min(first + PAGE_WINDOW, page_count)))
+            if len(ahead) > workers:
+                yield from ahead.popleft().result()
+        while ahead:
+            yield from ahead.popleft().result()
+    finally:
+        pool.shutdown(cancel_futures=True)  # the caller may stop reading early
+
+def extract_fields(pdf_path, workers=WORKERS):
+    """
+    Finds File Number, Homeowner Name(s), document type and Date, reading pages only until all
+    four are found and the document type is the first one in DOC_TYPES (a lower-ranked type
+    keeps the search going, as the whole text was checked in DOC_TYPES order before). Returns a dict with the keys it found ("client_id", "client_names", "doc_type", "date").
+    """
+    found = {}
+    doc_rank = len(DOC_TYPES)  # rank of the document type found so far
+    tail = ""
+    for page_text in iter_page_texts(pdf_path, workers):
+        window = tail + page_text
+        for key, field_re in (("client_id", FILE_NUMBER_RE), ("client_names", NAMES_RE), ("date", DATE_RE)):
+            if key not in found:
+                m = field_re.search(window)
+                if m:
+                    found[key] = m.group(1)
+        # A phrase ranked higher in DOC_TYPES wins even if it appears on a later page
+        for rank, (phrase, doc_type) in enumerate(DOC_TYPES[:doc_rank]):
+            if phrase in window:
+                found["doc_type"], doc_rank = doc_type, rank
+                break
+        if len(found) == 4 and doc_rank == 0:
+            break
+        tail = window[-PAGE_OVERLAP:]
+    return found
+
+def extract_info_from_pdf(pdf_path, workers=WORKERS):
+    fields = extract_fields(pdf_path, workers)
 
     # Extract Client ID
-    client_id_match = re.search(r'File Number: ([A-Z\-0-9]+)', text)
-    client_id = client_id_match.group(1) if client_id_match else "UnknownID"
+    client_id = fields.get("client_id", "UnknownID")
 
     # Extract Client Names
-    client_names_match = re.search(r'Homeowner Name\(s\): (.+)', text)
-    client_names = client_names_match.group(1) if client_names_match else "UnknownClients"
+    client_names = fields.get("client_names", "UnknownClients")
     client_names_clean = client_names.replace(' ', '').replace('and', '_')
 
     # Determine Document Type
-    if "Forward Sale Option and Exchange Agreement" in text:
-        doc_type = "ForwardSaleAgreement"
-    elif "Compliance Agreement" in text:
-        doc_type = "ComplianceAgreement"
-    elif "Affidavit" in text:
-        doc_type = "Affidavit"
-    else:
-        doc_type = "GeneralDoc"
+    doc_type = fields.get("doc_type", "GeneralDoc")
 
     # Extract Date
-    date_match = re.search(r'Date: ([A-Za-z]+\s\d{1,2},\s\d{4})', text)
-    if date_match:
-        date_str = date_match.group(1)
-        date = datetime.strptime(date_str, "%B %d, %Y").strftime("%m%d%Y")
+    if "date" in fields:
+        date = datetime.strptime(fields["date"], "%B %d, %Y").strftime("%m%d%Y")
     else:
         date = "UnknownDate"
 
     filename = f"{client_id}_{client_names_clean}_{doc_type}_{date}.pdf"
     return filename
 
-def rename_and_move_pdf(original_path, destination_folder):
-    new_filename = extract_info_from_pdf(original_path)
-    new_path = os.path.join(destination_folder, new_filename)
-
-    if not os.path.exists(destination_folder):
-        os.makedirs(destination_folder)
-
-    os.rename(original_path, new_path)
+def rename_and_move_pdf(original_path, destination_folder, workers=WORKERS):
+    new_filename = extract_info_from_pdf(original_path, workers)
+    new_path = move_pdf(original_path, destination_folder, new_filename)
     print(f"Renamed and moved to: {new_path}")
+    return new_path
+
+def rename_and_move_batch(pdf_paths, destination_folder, workers=WORKERS):
+    """
+    Names the PDFs in parallel (one file per worker process) and moves them in input order, one at
+    a time in this process, so duplicate names are numbered predictably. Returns the number of
+    files that failed.
+    """
+    if workers <= 1 or len(pdf_paths) <= 1:
+        jobs = [(path, lambda path=path: extract_info_from_pdf(path, workers)) for path in pdf_paths]
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(pdf_paths)))
+        jobs = [(path, pool.submit(extract_info_from_pdf, path, 1).result) for path in pdf_paths]
+    failed = 0
+    try:
+        for path, get_name in jobs:
+            try:
+                new_path = move_pdf(path, destination_folder, get_name())
+                print(f"Renamed and moved to: {new_path}")
+            except Exception as e:
+                failed += 1
+                print(f"Failed: {path}: {e}")
+    finally:
+        if pool:
+            pool.shutdown()
+    return failed
 
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) != 3:
-        print("Usage: python pdf_namer.py <path_to_pdf> <destination_folder>")
-        sys.exit(1)
-
-    pdf_file = sys.argv[1]
-    destination_folder = sys.argv[2]
+    import argparse
+    parser = argparse.ArgumentParser(description="Rename PDFs from their File Number, homeowners, "
+                                                 "document type and date, and move them to a folder.")
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns")
+    parser.add_argument("destination_folder")
+    parser.add_argument("--jobs", "-j", type=int, default=WORKERS,
+                        help=f"files to process in parallel (default: {WORKERS})")
+    args = parser.parse_args()
 
-    rename_and_move_pdf(pdf_file, destination_folder)
+    sys.exit(1 if rename_and_move_batch(expand_inputs(args.inputs), args.destination_folder,
+                                        max(1, args.jobs)) else 0)
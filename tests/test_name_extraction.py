@@ -0,0 +1,41 @@
+# Borrower-name extraction must keep giving the same names as the original substring-scan rules.
+# name_corpus.json holds labelled texts with the name the original extract_base_filename picked.
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import clio_app  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "name_corpus.json")
+
+
+def load_corpus():
+    with open(CORPUS, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_corpus_names_unchanged():
+    mismatches = [(case["text"], case["name"], clio_app.find_borrower_name(case["text"]))
+                  for case in load_corpus() if clio_app.find_borrower_name(case["text"]) != case["name"]]
+    assert not mismatches
+
+
+def test_not_borrower_matcher_agrees_with_substring_scan():
+    # Every filter word, alone and inside other text, plus every line of the corpus
+    candidates = [line.lower() for case in load_corpus() for line in case["text"].splitlines()]
+    for word in clio_app.NOT_BORROWER_FILTERS:
+        candidates += [word, f"john {word}", f"{word}smith", word[:-1], word[1:]]
+    for cand in candidates:
+        expected = any(nb in cand for nb in clio_app.NOT_BORROWER_FILTERS)
+        assert bool(clio_app.NOT_BORROWER_RE.search(cand)) == expected, cand
+
+
+def test_first_confident_page_wins():
+    # Naming stops at the first page with a confident label; a higher-priority label later is not read
+    doc = clio_app.fitz.open()
+    for text in ("Borrower: John Smith", "Borrower(s): Jane Doe"):
+        doc.new_page().insert_text((72, 72), text)
+    assert clio_app.detect_borrower_name(doc) == "John Smith"
+    assert clio_app.find_borrower_name("".join(page.get_text() for page in doc)) == "Jane Doe"